@@ -0,0 +1,259 @@
+import argparse
+import csv
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2 as cv
+import common_path  # puts ../common on sys.path
+from main import create_detector, OverlayRenderer
+from tracker import TagTracker
+from tiled_detector import TiledDetector, auto_detector_settings
+from frame_sources import ImageSequenceSource, VideoFileSource, list_images
+
+
+STAGES = ("read", "detect", "render", "write")
+
+
+def video_writer(path, fps, frame):
+    fourcc = "mp4v" if path.lower().endswith(".mp4") else "MJPG"
+    return cv.VideoWriter(path, cv.VideoWriter_fourcc(*fourcc), fps, (frame.shape[1], frame.shape[0]))
+
+
+def tag_records(tags):
+    return [{"id": int(tag.tag_id), "corners": [[round(float(x), 2), round(float(y), 2)] for x, y in tag.corners]} for tag in tags]
+
+
+def open_job_source(job):
+    if job["kind"] == "images":
+        return ImageSequenceSource(job["paths"])
+    return VideoFileSource(job["input"], start=job["start"], stop=job["stop"])
+
+
+def read_frames(job):
+    with open_job_source(job) as source:
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                return
+
+            # Both sources have already advanced past the frame they returned.
+            if job["kind"] == "images":
+                yield job["start"] + source.index - 1, source.path, frame
+            else:
+                yield source.index - 1, None, frame
+
+
+def process_chunk(job):
+    if job["high_res"]:
+        april_detector = TiledDetector(workers=job["cores"])
+    else:
+        april_detector = None
+
+    renderer = OverlayRenderer(job["image_folder"])
+    tracker = None
+    writer = None
+
+    records = []
+    timings = dict.fromkeys(STAGES, 0.0)
+    frames = read_frames(job)
+
+    try:
+        while True:
+            start = time.perf_counter()
+            item = next(frames, None)
+            read_done = time.perf_counter()
+            if item is None:
+                break
+
+            index, path, frame = item
+
+            if tracker is None:
+                if april_detector is None:
+                    april_detector = create_detector(**auto_detector_settings(frame.shape[1], frame.shape[0], job["cores"]))
+                tracker = TagTracker(april_detector, job["full_search_interval"], report_interval=0, roi_detector=create_detector())
+
+            tags = tracker.detect(cv.cvtColor(frame, cv.COLOR_BGR2GRAY))
+            detect_done = time.perf_counter()
+
+            # Stills are unrelated to each other, so no smoothed corners carry over from the previous image.
+            if job["kind"] == "images":
+                renderer.tag_states.reset()
+            output_image = renderer.render(frame, tags)
+            render_done = time.perf_counter()
+
+            if job["kind"] == "images":
+                cv.imwrite(os.path.join(job["output"], os.path.basename(path)), output_image)
+            else:
+                if writer is None:
+                    writer = video_writer(job["output"], job["fps"], output_image)
+                writer.write(output_image)
+            write_done = time.perf_counter()
+
+            records.append((index, tag_records(tags)))
+            timings["read"] += read_done - start
+            timings["detect"] += detect_done - read_done
+            timings["render"] += render_done - detect_done
+            timings["write"] += write_done - render_done
+    finally:
+        frames.close()
+        if writer is not None:
+            writer.release()
+        if isinstance(april_detector, TiledDetector):
+            april_detector.close()
+
+    return records, timings
+
+
+def plan_jobs(args):
+    base = {
+        "input": args.input,
+        "image_folder": args.images,
+        "high_res": args.high_res,
+        "full_search_interval": args.full_search_interval if not args.no_tracking else 1,
+        # Worker processes already use every core, so each one only gets its share of detector threads.
+        "cores": max(1, (os.cpu_count() or 1) // args.workers),
+    }
+
+    if os.path.isdir(args.input):
+        os.makedirs(args.output, exist_ok=True)
+        paths = list_images(args.input)
+        chunk = args.chunk_frames or max(1, math.ceil(len(paths) / args.workers))
+        # Every image gets a full search: a tag in one still says nothing about where tags are in the next.
+        return [
+            dict(base, kind="images", full_search_interval=1, paths=paths[start:start + chunk], start=start, output=args.output)
+            for start in range(0, len(paths), chunk)
+        ]
+
+    cap = cv.VideoCapture(args.input)
+    total = int(cap.get(cv.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    chunk = args.chunk_frames or max(1, math.ceil(total / args.workers))
+    starts = list(range(0, total, chunk))
+    if len(starts) <= 1:
+        return [dict(base, kind="video", start=0, stop=None, fps=fps, output=args.output)]
+
+    # The last chunk reads to the end of the file, since CAP_PROP_FRAME_COUNT often undercounts MJPEG and VFR files.
+    root, ext = os.path.splitext(args.output)
+    return [
+        dict(
+            base, kind="video", start=start, stop=start + chunk if part < len(starts) - 1 else None, fps=fps,
+            output=f"{root}.part{part:03d}{ext}",
+        )
+        for part, start in enumerate(starts)
+    ]
+
+
+def concat_videos(parts, output):
+    # ffmpeg's concat demuxer copies the encoded packets, so the chunks are joined without a second lossy encode.
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        for part in parts:
+            f.write(f"file '{os.path.abspath(part)}'\n")
+        listing = f.name
+
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", listing, "-c", "copy", output],
+            capture_output=True, text=True,
+        )
+    finally:
+        os.remove(listing)
+
+    if result.returncode != 0:
+        print(f"Error: ffmpeg could not join the chunks: {result.stderr.strip()}")
+    return result.returncode == 0
+
+
+def join_videos(parts, output, fps):
+    if shutil.which("ffmpeg") and concat_videos(parts, output):
+        for part in parts:
+            os.remove(part)
+        return "copy"
+
+    # Without ffmpeg the chunks are decoded and encoded again on one core: this costs a second generation of
+    # compression loss and runs at roughly single-process speed, so install ffmpeg for long recordings.
+    writer = None
+    for part in parts:
+        cap = cv.VideoCapture(part)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if writer is None:
+                writer = video_writer(output, fps, frame)
+            writer.write(frame)
+        cap.release()
+        os.remove(part)
+
+    if writer is not None:
+        writer.release()
+    return "re-encode"
+
+
+def write_log(path, records):
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            log = csv.writer(f)
+            log.writerow(["frame", "tag_id", "x0", "y0", "x1", "y1", "x2", "y2", "x3", "y3"])
+            for index, tags in records:
+                for tag in tags:
+                    log.writerow([index, tag["id"]] + [value for corner in tag["corners"] for value in corner])
+    else:
+        with open(path, "w") as f:
+            for index, tags in records:
+                f.write(json.dumps({"frame": index, "tags": tags}) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlay images on AprilTags in a video file or image directory without a display.")
+    parser.add_argument("input", help="video file or directory of images")
+    parser.add_argument("output", help="output video file, or output directory for image input")
+    parser.add_argument("--log", help="per-frame detection log (.jsonl or .csv)")
+    parser.add_argument("--images", default="images", help="overlay image folder")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-frames", type=int, default=0, help="frames per job (default: split evenly across workers)")
+    parser.add_argument("--full-search-interval", type=int, default=30)
+    parser.add_argument("--no-tracking", action="store_true")
+    parser.add_argument("--high-res", action="store_true", help="use tiled multi-core detection")
+    args = parser.parse_args()
+
+    jobs = plan_jobs(args)
+    start = time.perf_counter()
+
+    records = []
+    timings = dict.fromkeys(STAGES, 0.0)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for chunk_records, chunk_timings in pool.map(process_chunk, jobs):
+            records.extend(chunk_records)
+            for stage in STAGES:
+                timings[stage] += chunk_timings[stage]
+
+    join_method = None
+    join_start = time.perf_counter()
+    if jobs and jobs[0]["kind"] == "video" and len(jobs) > 1:
+        join_method = join_videos([job["output"] for job in jobs], args.output, jobs[0]["fps"])
+    join_elapsed = time.perf_counter() - join_start
+
+    elapsed = time.perf_counter() - start
+    frame_count = len(records)
+
+    if args.log:
+        write_log(args.log, records)
+
+    print(f"Processed {frame_count} frames in {elapsed:.2f} s ({frame_count / elapsed if elapsed else 0.0:.1f} fps) with {args.workers} workers")
+    for stage in STAGES:
+        per_frame = timings[stage] / frame_count * 1000.0 if frame_count else 0.0
+        print(f"  {stage}: {per_frame:.2f} ms/frame")
+    if join_method is not None:
+        print(f"  join ({join_method}): {join_elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import math
+import cv2 as cv
+import numpy as np
+
+
+class Compositor:
+    def __init__(self, dilate_iterations=2):
+        self.dilate_iterations = dilate_iterations
+        self.rect_element = cv.getStructuringElement(cv.MORPH_RECT, (3, 3))
+        self.output = None
+
+    def begin(self, frame):
+        if self.output is None or self.output.shape != frame.shape:
+            self.output = np.empty_like(frame)
+        np.copyto(self.output, frame)
+        return self.output
+
+    def tag_rect(self, corners):
+        h, w = self.output.shape[:2]
+        pad = self.dilate_iterations + 1
+
+        x0 = max(0, math.floor(corners[:, 0].min()) - pad)
+        y0 = max(0, math.floor(corners[:, 1].min()) - pad)
+        x1 = min(w, math.ceil(corners[:, 0].max()) + pad + 1)
+        y1 = min(h, math.ceil(corners[:, 1].max()) + pad + 1)
+        return x0, y0, x1, y1
+
+    def warp(self, source_image, corners):
+        x0, y0, x1, y1 = self.tag_rect(corners)
+        roi_w, roi_h = x1 - x0, y1 - y0
+        if roi_w <= 0 or roi_h <= 0:
+            return None
+
+        src_h, src_w = source_image.shape[:2]
+        src_mat = np.float32([[0, 0], [src_w, 0], [src_w, src_h], [0, src_h]])
+        dst_mat = np.float32(corners - (x0, y0))
+
+        homography_matrix = cv.getPerspectiveTransform(src_mat, dst_mat)
+        warped_image = cv.warpPerspective(source_image, homography_matrix, (roi_w, roi_h))
+
+        mask = np.zeros((roi_h, roi_w), dtype="uint8")
+        cv.fillConvexPoly(mask, np.round(dst_mat).astype("int32"), 255, cv.LINE_AA)
+        mask = cv.dilate(mask, self.rect_element, iterations=self.dilate_iterations)
+
+        return (x0, y0, x1, y1), warped_image, mask
+
+    def overlay(self, source_image, corners, state=None):
+        # A tag that has not moved past its state's tolerance reuses last frame's warp and mask.
+        if state is not None and state.is_cached(source_image, corners, self.output.shape):
+            rect, warped_image, mask = state.rect, state.warped_image, state.mask
+        else:
+            geometry = self.warp(source_image, corners)
+            if geometry is None:
+                return
+            rect, warped_image, mask = geometry
+            if state is not None:
+                state.store(source_image, corners, self.output.shape, rect, warped_image, mask)
+
+        x0, y0, x1, y1 = rect
+        self.blend(self.output[y0:y1, x0:x1], warped_image, mask)
+
+    def overlay_all(self, overlays):
+        for source_image, corners, state in overlays:
+            if source_image is not None:
+                self.overlay(source_image, corners, state)
+
+    def blend(self, roi, warped_image, mask):
+        # Fixed-point alpha blend: (fg * a + bg * (255 - a)) / 255, with an exact
+        # rounding divide by 255 so the result matches the float path.
+        alpha = mask[:, :, None].astype("uint16")
+        blended = warped_image.astype("uint16") * alpha
+        blended += roi.astype("uint16") * (255 - alpha)
+        blended += 128
+        blended += blended >> 8
+        blended >>= 8
+        roi[...] = blended
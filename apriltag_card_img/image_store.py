@@ -0,0 +1,92 @@
+import json
+import os
+from collections import OrderedDict
+import cv2 as cv
+import numpy as np
+import common_path  # puts ../common on sys.path
+from frame_sources import IMAGE_EXTENSIONS
+
+
+def on_screen_size(corners):
+    edges = corners - np.roll(corners, 1, axis=0)
+    return float(np.sqrt((edges * edges).sum(axis=1)).max())
+
+
+class ImageStore:
+    def __init__(self, folder, manifest="manifest.json", memory_budget=256 * 1024 * 1024, min_level_size=32):
+        self.folder = folder
+        self.memory_budget = memory_budget
+        self.min_level_size = min_level_size
+
+        self.paths = self.load_mapping(manifest)
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+
+    def load_mapping(self, manifest):
+        manifest_path = os.path.join(self.folder, manifest) if manifest else None
+
+        # An explicit manifest wins; otherwise numeric filenames ("12.png") map straight to tag IDs.
+        if manifest_path and os.path.isfile(manifest_path):
+            with open(manifest_path) as f:
+                entries = json.load(f)
+            return {int(tag_id): os.path.join(self.folder, filename) for tag_id, filename in entries.items()}
+
+        paths = {}
+        for entry in os.scandir(self.folder):
+            stem, ext = os.path.splitext(entry.name)
+            if entry.is_file() and ext.lower() in IMAGE_EXTENSIONS and stem.isdigit():
+                paths[int(stem)] = entry.path
+        return paths
+
+    def __contains__(self, tag_id):
+        return tag_id in self.paths
+
+    def __len__(self):
+        return len(self.paths)
+
+    def build_pyramid(self, image):
+        levels = [image]
+        while min(levels[-1].shape[:2]) // 2 >= self.min_level_size:
+            levels.append(cv.pyrDown(levels[-1]))
+        return levels
+
+    def load(self, tag_id):
+        levels = self.cache.get(tag_id)
+        if levels is not None:
+            self.cache.move_to_end(tag_id)
+            return levels
+
+        path = self.paths.get(tag_id)
+        if path is None:
+            return None
+
+        image = cv.imread(path)
+        if image is None:
+            print(f"Error: Could not read overlay image {path}.")
+            del self.paths[tag_id]
+            return None
+
+        levels = self.build_pyramid(image)
+        self.cache[tag_id] = levels
+        self.cache_bytes += sum(level.nbytes for level in levels)
+        self.evict()
+        return levels
+
+    def evict(self):
+        # The most recently used entry sits at the end and is never evicted.
+        while self.cache_bytes > self.memory_budget and len(self.cache) > 1:
+            _, levels = self.cache.popitem(last=False)
+            self.cache_bytes -= sum(level.nbytes for level in levels)
+
+    def get(self, tag_id, target_size=None):
+        levels = self.load(tag_id)
+        if levels is None:
+            return None
+        if target_size is None:
+            return levels[0]
+
+        # Smallest pyramid level that is still at least as large as the tag on screen.
+        for level in reversed(levels):
+            if max(level.shape[:2]) >= target_size:
+                return level
+        return levels[0]
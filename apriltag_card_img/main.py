@@ -1,104 +1,134 @@
-import copy
-import os
+import sys
 import cv2 as cv
 import numpy as np
 from pupil_apriltags import Detector
 import helper
-
-
-def draw_tags(image, tags):
-    tag_id = -1
-    pt_a, pt_b, pt_c, pt_d = (0, 0), (0, 0), (0, 0), (0, 0)
+import common_path  # puts ../common on sys.path
+from hud import Hud
+from tracker import TagTracker
+from compositor import Compositor
+from image_store import ImageStore, on_screen_size
+from tag_state import TagStates
+from pipeline import PipelineRunner
+from tiled_detector import TiledDetector, auto_detector_settings
+from frame_sources import open_source
+from telemetry import Telemetry, parse_telemetry
+
+
+def draw_tags(image, tags, hud=None):
+    hud = hud or Hud()
+    placements = []
 
     for tag in tags:
-        (pt_a, pt_b, pt_c, pt_d) = tag.corners
-        pt_a, pt_b, pt_c, pt_d = map(lambda pt: (int(pt[0]), int(pt[1])), [pt_a, pt_b, pt_c, pt_d])
-
-        helper.line_with_border(image, pt_a, pt_b, (0, 255, 0), 2)
-        helper.line_with_border(image, pt_b, pt_c, (0, 255, 0), 2)
-        helper.line_with_border(image, pt_c, pt_d, (0, 255, 0), 2)
-        helper.line_with_border(image, pt_d, pt_a, (0, 255, 0), 2)
+        # Every tag outline is queued and drawn in one batched pass: one call for the borders, one for the strokes.
+        hud.polyline(np.int32(tag.corners), (0, 255, 0), 2, border=True)
 
         c_x, c_y = int(tag.center[0]), int(tag.center[1])
-        cv.circle(image, (c_x, c_y), 5, (0, 0, 0), -1)
-
-        tag_id = tag.tag_id
-
-    return image, pt_a, pt_b, pt_c, pt_d, tag_id
+        hud.circle((c_x, c_y), 5, (0, 0, 0))
 
+        # Corners come back bottom-left first; the overlay wants top-left, top-right, bottom-right, bottom-left.
+        placements.append((tag.tag_id, np.float32(tag.corners[::-1])))
 
-def load_images_from_folder(folder):
-    images = []
-    for filename in os.listdir(folder):
-        img_path = os.path.join(folder, filename)
-        img = cv.imread(img_path)
-        if img is not None:
-            images.append(img)
-    return images
+    hud.flush(image)
+    return image, placements
 
 
-def main():
-    cap = cv.VideoCapture(0)
-
-    april_detector = Detector(
+def create_detector(nthreads=1, quad_decimate=1.0):
+    return Detector(
         families='tag36h11',
-        nthreads=1,
-        quad_decimate=1.0,
+        nthreads=nthreads,
+        quad_decimate=quad_decimate,
         quad_sigma=0.0,
         refine_edges=1,
         decode_sharpening=0.25,
         debug=0,
     )
 
-    images = load_images_from_folder("images")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+class OverlayRenderer:
+    def __init__(self, image_folder="images"):
+        self.compositor = Compositor()
+        self.tag_states = TagStates()
+        self.images = ImageStore(image_folder)
+        self.hud = Hud()
 
-        color_image = copy.deepcopy(frame)
-        gray_image = cv.cvtColor(color_image, cv.COLOR_BGR2GRAY)
+    def render(self, frame, tags, status=None):
+        output_image = self.compositor.begin(frame)
+        output_image, placements = draw_tags(output_image, tags, self.hud)
 
-        tags = april_detector.detect(
-            gray_image, estimate_tag_pose=False, camera_params=None, tag_size=None
+        self.compositor.overlay_all(
+            (self.images.get(tag_id, on_screen_size(state.corners)), state.corners, state)
+            for tag_id, state in self.tag_states.update(placements) if tag_id in self.images
         )
 
-        color_image, ref_pt_bl, ref_pt_br, ref_pt_tr, ref_pt_tl, tag_id = draw_tags(color_image, tags)
+        if status:
+            helper.text_with_border(output_image, status, (10, 30), cv.FONT_HERSHEY_SIMPLEX, 0.75, (255, 255, 255), 2, cv.LINE_AA, False)
+
+        return output_image
+
+
+def main(source=0, use_tracking=True, full_search_interval=30, pipelined=True, high_res=False, realtime=False, telemetry=None):
+    # The pipeline keeps several frames in flight, so the source must hand out a fresh array per read.
+    cap = open_source(source, realtime=realtime, threaded=False)
+
+    ret, first_frame = cap.read()
+    if not ret:
+        print("Error: Could not read frame.")
+        cap.release()
+        return
 
-        output_image = color_image
+    height, width = first_frame.shape[:2]
+    if high_res:
+        april_detector = TiledDetector()
+    else:
+        april_detector = create_detector(**auto_detector_settings(width, height))
 
-        if tag_id != -1 and tag_id < len(images):
-            dst_mat = np.array([ref_pt_tl, ref_pt_tr, ref_pt_br, ref_pt_bl])
+    tracker = TagTracker(april_detector, full_search_interval if use_tracking else 1, roi_detector=create_detector())
+    renderer = OverlayRenderer("images")
+    telemetry = telemetry or Telemetry()
 
-            source_image = images[tag_id]
-            src_h, src_w = source_image.shape[:2]
-            src_mat = np.array([[0, 0], [src_w, 0], [src_w, src_h], [0, src_h]])
+    # The first frame was only read to size the detector; hand it back out so replays stay frame-exact.
+    pending = [first_frame]
 
-            homography_matrix, _ = cv.findHomography(src_mat, dst_mat)
-            warped_image = cv.warpPerspective(source_image, homography_matrix, (color_image.shape[1], color_image.shape[0]))
+    def read_frame():
+        if pending:
+            return True, pending.pop()
+        with telemetry.stage("capture"):
+            return cap.read()
 
-            mask = np.zeros((color_image.shape[0], color_image.shape[1]), dtype="uint8")
-            cv.fillConvexPoly(mask, dst_mat.astype("int32"), 255, cv.LINE_AA)
+    def detect(frame):
+        with telemetry.stage("color_convert"):
+            gray_image = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+        with telemetry.stage("detect"):
+            return tracker.detect(gray_image)
 
-            rect_element = cv.getStructuringElement(cv.MORPH_RECT, (3, 3))
-            mask = cv.dilate(mask, rect_element, iterations=2)
+    def display(frame, tags):
+        with telemetry.stage("render"):
+            output_image = renderer.render(frame, tags, f"{tracker.last_path}: {tracker.last_detection_ms:.1f} ms")
+            telemetry.draw(output_image, (10, 60))
 
-            mask_scaled = mask / 255.0
-            mask_scaled = np.dstack([mask_scaled] * 3)
+        with telemetry.stage("display"):
+            cv.imshow("apriltags", output_image)
+            key = cv.waitKey(1) & 0xFF
+        telemetry.frame_done()
 
-            warped_multiplied = cv.multiply(warped_image.astype("float"), mask_scaled)
-            image_multiplied = cv.multiply(frame.astype("float"), 1.0 - mask_scaled)
-            output_image = cv.add(warped_multiplied, image_multiplied).astype("uint8")
+        return key != ord('q')
 
-        cv.imshow("apriltags", output_image)
+    if pipelined:
+        PipelineRunner(read_frame, detect, display).run()
+    else:
+        while True:
+            ret, frame = read_frame()
+            if not ret or not display(frame, detect(frame)):
+                break
 
-        if cv.waitKey(1) & 0xFF == ord('q'):
-            break
+    if high_res:
+        april_detector.close()
 
     cap.release()
     cv.destroyAllWindows()
 
 
 if __name__ == "__main__":
-    main()
+    specs = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    main(specs[0] if specs else 0, telemetry=parse_telemetry(sys.argv))
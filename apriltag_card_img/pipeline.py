@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+
+
+class DropQueue:
+    def __init__(self, maxsize=2):
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        # When the consumer falls behind, the oldest item is thrown away so latency stays bounded.
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=0.1):
+        return self.queue.get(timeout=timeout)
+
+    def depth(self):
+        return self.queue.qsize()
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.busy = 0.0
+
+    def add(self, elapsed):
+        self.count += 1
+        self.busy += elapsed
+
+    def reset(self):
+        self.count = 0
+        self.busy = 0.0
+
+
+class PipelineRunner:
+    def __init__(self, read_frame, detect, display, queue_size=2, report_interval=2.0):
+        self.read_frame = read_frame
+        self.detect = detect
+        self.display = display
+        self.report_interval = report_interval
+
+        self.frame_queue = DropQueue(queue_size)
+        self.result_queue = DropQueue(queue_size)
+
+        self.stop_event = threading.Event()
+        self.capture_done = threading.Event()
+        self.detect_done = threading.Event()
+
+        self.stats = {name: StageStats(name) for name in ("capture", "detect", "display")}
+        self.last_report = time.perf_counter()
+
+    def capture_loop(self):
+        try:
+            while not self.stop_event.is_set():
+                start = time.perf_counter()
+                ret, frame = self.read_frame()
+                if not ret:
+                    break
+                self.stats["capture"].add(time.perf_counter() - start)
+                self.frame_queue.put(frame)
+        except Exception as e:
+            print(f"Error in capture stage: {e}")
+        finally:
+            self.capture_done.set()
+
+    def detect_loop(self):
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    frame = self.frame_queue.get()
+                except queue.Empty:
+                    if self.capture_done.is_set() and self.frame_queue.depth() == 0:
+                        break
+                    continue
+
+                start = time.perf_counter()
+                tags = self.detect(frame)
+                self.stats["detect"].add(time.perf_counter() - start)
+                self.result_queue.put((frame, tags))
+        except Exception as e:
+            print(f"Error in detect stage: {e}")
+        finally:
+            self.detect_done.set()
+
+    def report(self):
+        now = time.perf_counter()
+        elapsed = now - self.last_report
+        if elapsed < self.report_interval:
+            return
+
+        parts = []
+        for stage in self.stats.values():
+            busy_ms = stage.busy / stage.count * 1000.0 if stage.count else 0.0
+            parts.append(f"{stage.name}: {stage.count / elapsed:.1f} fps ({busy_ms:.1f} ms)")
+            stage.reset()
+        parts.append(f"queues: {self.frame_queue.depth()}/{self.result_queue.depth()}")
+        parts.append(f"dropped: {self.frame_queue.dropped}/{self.result_queue.dropped}")
+        print("Pipeline - " + ", ".join(parts))
+
+        self.last_report = now
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self.capture_loop, daemon=True),
+            threading.Thread(target=self.detect_loop, daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Display stays on the calling thread, since most GUI backends require it.
+        try:
+            while True:
+                try:
+                    frame, tags = self.result_queue.get()
+                except queue.Empty:
+                    if self.detect_done.is_set() and self.result_queue.depth() == 0:
+                        break
+                    continue
+
+                start = time.perf_counter()
+                keep_running = self.display(frame, tags)
+                self.stats["display"].add(time.perf_counter() - start)
+
+                if self.report_interval:
+                    self.report()
+                if not keep_running:
+                    break
+        finally:
+            self.stop_event.set()
+            for thread in threads:
+                thread.join()
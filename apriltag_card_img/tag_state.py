@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class TagState:
+    __slots__ = (
+        "corners", "velocity", "alpha", "beta", "snap_distance", "tolerance", "missed",
+        "source", "frame_shape", "cached_corners", "rect", "warped_image", "mask",
+    )
+
+    def __init__(self, corners, alpha=0.5, beta=0.05, snap_distance=40.0, tolerance=0.75):
+        self.corners = np.float32(corners)
+        self.velocity = np.zeros_like(self.corners)
+        self.alpha = alpha
+        self.beta = beta
+        self.snap_distance = snap_distance
+        self.tolerance = tolerance
+        self.missed = 0
+
+        self.source = None
+        self.frame_shape = None
+        self.cached_corners = None
+        self.rect = None
+        self.warped_image = None
+        self.mask = None
+
+    def update(self, measured):
+        # Constant-velocity alpha-beta filter (a fixed-gain Kalman filter) over all four corners at once.
+        predicted = self.corners + self.velocity
+        residual = measured - predicted
+
+        if np.abs(residual).max() > self.snap_distance:
+            self.corners = np.float32(measured)
+            self.velocity[:] = 0
+        else:
+            self.corners = predicted + self.alpha * residual
+            self.velocity += self.beta * residual
+
+        self.missed = 0
+        return self.corners
+
+    def is_cached(self, source_image, corners, frame_shape):
+        return (
+            self.cached_corners is not None
+            and self.source is source_image
+            and self.frame_shape == frame_shape
+            and np.abs(corners - self.cached_corners).max() <= self.tolerance
+        )
+
+    def store(self, source_image, corners, frame_shape, rect, warped_image, mask):
+        self.source = source_image
+        self.frame_shape = frame_shape
+        self.cached_corners = corners.copy()
+        self.rect = rect
+        self.warped_image = warped_image
+        self.mask = mask
+
+
+class TagStates:
+    def __init__(self, alpha=0.5, beta=0.05, snap_distance=40.0, tolerance=0.75, max_missed=5):
+        self.alpha = alpha
+        self.beta = beta
+        self.snap_distance = snap_distance
+        self.tolerance = tolerance
+        self.max_missed = max_missed
+        self.states = {}
+
+    def update(self, placements):
+        seen = set()
+        updated = []
+
+        for tag_id, corners in placements:
+            state = self.states.get(tag_id)
+            if state is None:
+                state = TagState(corners, self.alpha, self.beta, self.snap_distance, self.tolerance)
+                self.states[tag_id] = state
+            else:
+                state.update(corners)
+
+            seen.add(tag_id)
+            updated.append((tag_id, state))
+
+        for tag_id in list(self.states):
+            if tag_id not in seen:
+                self.states[tag_id].missed += 1
+                if self.states[tag_id].missed > self.max_missed:
+                    del self.states[tag_id]
+
+        return updated
+
+    def reset(self):
+        self.states.clear()
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from compositor import Compositor
+
+
+@pytest.fixture
+def compositor():
+    return Compositor()
+
+
+def float_blend(roi, warped_image, mask):
+    alpha = mask[:, :, None].astype(np.float64) / 255.0
+    return np.round(warped_image * alpha + roi * (1.0 - alpha)).astype(np.uint8)
+
+
+def test_blend_matches_the_float_path_exactly(compositor):
+    rng = np.random.default_rng(0)
+    roi = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    warped_image = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    mask = rng.integers(0, 256, (64, 64), dtype=np.uint8)
+    expected = float_blend(roi, warped_image, mask)
+
+    compositor.blend(roi, warped_image, mask)
+    assert np.array_equal(roi, expected)
+
+
+def test_blend_mask_extremes_pick_one_side(compositor):
+    roi = np.full((4, 4, 3), 10, dtype=np.uint8)
+    warped_image = np.full((4, 4, 3), 200, dtype=np.uint8)
+    mask = np.zeros((4, 4), dtype=np.uint8)
+    mask[:, 2:] = 255
+
+    compositor.blend(roi, warped_image, mask)
+    assert (roi[:, :2] == 10).all()
+    assert (roi[:, 2:] == 200).all()
+
+
+def test_blend_writes_through_a_view_of_the_output(compositor):
+    output = compositor.begin(np.zeros((20, 20, 3), dtype=np.uint8))
+    warped_image = np.full((5, 5, 3), 255, dtype=np.uint8)
+
+    compositor.blend(output[5:10, 5:10], warped_image, np.full((5, 5), 255, dtype=np.uint8))
+    assert output[5:10, 5:10].min() == 255
+    assert output.sum() == 255 * 5 * 5 * 3
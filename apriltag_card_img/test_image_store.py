@@ -0,0 +1,82 @@
+import json
+import cv2 as cv
+import numpy as np
+import pytest
+from image_store import ImageStore, on_screen_size
+
+
+def write_image(folder, name, size=64, value=0):
+    path = folder / name
+    cv.imwrite(str(path), np.full((size, size, 3), value, dtype=np.uint8))
+    return path
+
+
+@pytest.fixture
+def folder(tmp_path):
+    for tag_id in (1, 2, 3):
+        write_image(tmp_path, f"{tag_id}.png", value=tag_id)
+    write_image(tmp_path, "logo.png")
+    return tmp_path
+
+
+def level_bytes(size, min_level_size=32):
+    total = 0
+    while size >= min_level_size:
+        total += size * size * 3
+        size //= 2
+    return total
+
+
+def test_numeric_filenames_map_to_tag_ids(folder):
+    store = ImageStore(str(folder))
+
+    assert sorted(store.paths) == [1, 2, 3]
+    assert 4 not in store
+
+
+def test_manifest_overrides_filenames(folder):
+    (folder / "manifest.json").write_text(json.dumps({"7": "logo.png"}))
+    store = ImageStore(str(folder))
+
+    assert list(store.paths) == [7]
+
+
+def test_pyramid_stops_at_the_minimum_level_size(folder):
+    store = ImageStore(str(folder), min_level_size=16)
+    levels = store.load(1)
+
+    assert [level.shape[0] for level in levels] == [64, 32, 16]
+
+
+def test_get_picks_the_smallest_level_that_still_covers_the_tag(folder):
+    store = ImageStore(str(folder), min_level_size=16)
+
+    assert store.get(1).shape[0] == 64
+    assert store.get(1, target_size=20).shape[0] == 32
+    assert store.get(1, target_size=32).shape[0] == 32
+    assert store.get(1, target_size=500).shape[0] == 64
+
+
+def test_least_recently_used_image_is_evicted_first(folder):
+    store = ImageStore(str(folder), memory_budget=2 * level_bytes(64))
+    store.load(1)
+    store.load(2)
+    store.load(1)
+    store.load(3)
+
+    assert list(store.cache) == [1, 3]
+    assert store.cache_bytes == 2 * level_bytes(64)
+
+
+def test_most_recent_image_is_kept_even_over_budget(folder):
+    store = ImageStore(str(folder), memory_budget=1)
+    store.load(1)
+    store.load(2)
+
+    assert list(store.cache) == [2]
+
+
+def test_on_screen_size_is_the_longest_edge():
+    corners = np.float32([[0, 0], [30, 0], [30, 40], [0, 40]])
+
+    assert on_screen_size(corners) == pytest.approx(40.0)
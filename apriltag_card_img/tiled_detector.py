@@ -0,0 +1,115 @@
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pupil_apriltags import Detector
+
+
+def auto_detector_settings(width, height, cores=None):
+    cores = cores or os.cpu_count() or 1
+    megapixels = width * height / 1e6
+
+    # Decimation trades small/far tag recall for speed; only lean on it once the input is large.
+    if megapixels <= 1.0:
+        quad_decimate = 1.0
+    elif megapixels <= 2.5:
+        quad_decimate = 1.5
+    else:
+        quad_decimate = 2.0
+
+    return {"nthreads": max(1, min(cores, 8)), "quad_decimate": quad_decimate}
+
+
+def auto_tile_grid(width, height, tile_size=1280):
+    return max(1, round(width / tile_size)), max(1, round(height / tile_size))
+
+
+class TiledDetector:
+    def __init__(self, grid=None, overlap=0.15, workers=None, families='tag36h11', **detector_kwargs):
+        self.grid = grid
+        self.overlap = overlap
+        self.workers = workers or os.cpu_count() or 1
+        self.families = families
+        # Tiling exists to keep full resolution on large frames; decimating the tiles as well would make it cost more
+        # than one multi-threaded decimated detector for the same recall. Pass quad_decimate to trade back.
+        self.detector_kwargs = {"quad_decimate": 1.0, **detector_kwargs}
+
+        self.local = threading.local()
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def tiles(self, shape):
+        h, w = shape[:2]
+        cols, rows = self.grid or auto_tile_grid(w, h)
+
+        # Overlap must be wider than the largest tag so every tag lies whole inside at least one tile.
+        pad = int(self.overlap * min(h, w))
+        tile_w, tile_h = math.ceil(w / cols), math.ceil(h / rows)
+
+        tiles = []
+        for row in range(rows):
+            for col in range(cols):
+                x0, y0 = max(0, col * tile_w - pad), max(0, row * tile_h - pad)
+                x1, y1 = min(w, (col + 1) * tile_w + pad), min(h, (row + 1) * tile_h + pad)
+                tiles.append((x0, y0, x1, y1))
+        return tiles
+
+    def get_detector(self, tile_shape, tile_count):
+        settings = auto_detector_settings(tile_shape[1], tile_shape[0], max(1, self.workers // tile_count))
+        settings.update(self.detector_kwargs)
+        key = tuple(sorted(settings.items()))
+
+        # The apriltag C detector is not safe to share between threads, so each worker owns one.
+        detector = getattr(self.local, "detector", None)
+        if detector is None or self.local.key != key:
+            detector = Detector(
+                families=self.families,
+                nthreads=settings["nthreads"],
+                quad_decimate=settings["quad_decimate"],
+                quad_sigma=settings.get("quad_sigma", 0.0),
+                refine_edges=settings.get("refine_edges", 1),
+                decode_sharpening=settings.get("decode_sharpening", 0.25),
+                debug=0,
+            )
+            self.local.detector = detector
+            self.local.key = key
+        return detector
+
+    def detect_tile(self, gray_image, tile, tile_count):
+        x0, y0, x1, y1 = tile
+        tile_image = gray_image[y0:y1, x0:x1]
+        detector = self.get_detector(tile_image.shape, tile_count)
+
+        tags = detector.detect(tile_image, estimate_tag_pose=False, camera_params=None, tag_size=None)
+        for tag in tags:
+            tag.corners = tag.corners + (x0, y0)
+            tag.center = tag.center + (x0, y0)
+        return tags
+
+    def merge(self, tag_lists):
+        kept = []
+        for tags in tag_lists:
+            for tag in tags:
+                size = np.linalg.norm(tag.corners[0] - tag.corners[2])
+                duplicate = None
+                for index, other in enumerate(kept):
+                    if other.tag_id == tag.tag_id and np.linalg.norm(other.center - tag.center) < size:
+                        duplicate = index
+                        break
+
+                if duplicate is None:
+                    kept.append(tag)
+                elif tag.decision_margin > kept[duplicate].decision_margin:
+                    kept[duplicate] = tag
+        return kept
+
+    def detect(self, gray_image, estimate_tag_pose=False, camera_params=None, tag_size=None):
+        tiles = self.tiles(gray_image.shape)
+        if len(tiles) == 1:
+            return self.detect_tile(gray_image, tiles[0], 1)
+
+        futures = [self.pool.submit(self.detect_tile, gray_image, tile, len(tiles)) for tile in tiles]
+        return self.merge(future.result() for future in futures)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,122 @@
+import time
+import numpy as np
+
+
+class Track:
+    __slots__ = ("corners", "velocity")
+
+    def __init__(self, corners):
+        self.corners = corners
+        self.velocity = np.zeros_like(corners)
+
+    def update(self, corners):
+        self.velocity = corners - self.corners
+        self.corners = corners
+
+    def predict(self):
+        return self.corners + self.velocity
+
+
+class TagTracker:
+    def __init__(self, detector, full_search_interval=30, roi_padding=0.5, min_roi_padding=24, report_interval=60,
+            roi_detector=None):
+        self.detector = detector
+        # The full-frame detector may decimate a large frame; ROI crops are small, so they get their own
+        # undecimated detector and keep the recall that decimation gives up on small or distant tags.
+        self.roi_detector = roi_detector or detector
+        self.full_search_interval = full_search_interval
+        self.roi_padding = roi_padding
+        self.min_roi_padding = min_roi_padding
+        self.report_interval = report_interval
+
+        self.tracks = {}
+        self.frames_since_full = 0
+        self.frame_count = 0
+
+        self.last_path = "full"
+        self.last_detection_ms = 0.0
+        self.timings = {"roi": [0.0, 0], "full": [0.0, 0]}
+
+    def roi_for(self, corners, shape):
+        h, w = shape[:2]
+        x_min, y_min = corners.min(axis=0)
+        x_max, y_max = corners.max(axis=0)
+        pad = max(self.min_roi_padding, self.roi_padding * max(x_max - x_min, y_max - y_min))
+
+        x0, y0 = max(0, int(x_min - pad)), max(0, int(y_min - pad))
+        x1, y1 = min(w, int(x_max + pad) + 1), min(h, int(y_max + pad) + 1)
+        return x0, y0, x1, y1
+
+    def detect_full(self, gray_image):
+        return self.detector.detect(gray_image, estimate_tag_pose=False, camera_params=None, tag_size=None)
+
+    def detect_rois(self, gray_image):
+        found = {}
+
+        for track in self.tracks.values():
+            x0, y0, x1, y1 = self.roi_for(track.predict(), gray_image.shape)
+            if x1 - x0 < 8 or y1 - y0 < 8:
+                continue
+
+            roi_tags = self.roi_detector.detect(gray_image[y0:y1, x0:x1], estimate_tag_pose=False, camera_params=None, tag_size=None)
+
+            for tag in roi_tags:
+                if tag.tag_id in found:
+                    continue
+                tag.corners = tag.corners + (x0, y0)
+                tag.center = tag.center + (x0, y0)
+                found[tag.tag_id] = tag
+
+        lost = any(tag_id not in found for tag_id in self.tracks)
+        return list(found.values()), lost
+
+    def update_tracks(self, tags):
+        tracks = {}
+        for tag in tags:
+            track = self.tracks.get(tag.tag_id)
+            if track is None:
+                track = Track(tag.corners)
+            else:
+                track.update(tag.corners)
+            tracks[tag.tag_id] = track
+        self.tracks = tracks
+
+    def detect(self, gray_image):
+        self.frames_since_full += 1
+        start = time.perf_counter()
+
+        path = "full"
+        if self.tracks and self.frames_since_full < self.full_search_interval:
+            tags, lost = self.detect_rois(gray_image)
+            path = "roi"
+
+            # A lost tag falls back to a full search in the same frame, and the ROI attempt is charged to it.
+            if lost:
+                path = "full"
+
+        if path == "full":
+            tags = self.detect_full(gray_image)
+            self.frames_since_full = 0
+
+        self.last_detection_ms = (time.perf_counter() - start) * 1000.0
+        self.last_path = path
+        self.update_tracks(tags)
+        self.record(path, self.last_detection_ms)
+
+        return tags
+
+    def record(self, path, elapsed_ms):
+        self.timings[path][0] += elapsed_ms
+        self.timings[path][1] += 1
+        self.frame_count += 1
+
+        if self.report_interval and self.frame_count % self.report_interval == 0:
+            print(self.report())
+            self.timings = {"roi": [0.0, 0], "full": [0.0, 0]}
+
+    def report(self):
+        parts = []
+        for path, (total_ms, count) in self.timings.items():
+            average = total_ms / count if count else 0.0
+            parts.append(f"{path}: {average:.2f} ms avg over {count} frames")
+        return "Detection - " + ", ".join(parts)
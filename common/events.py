@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+
+GESTURE_STARTED = "gesture_started"
+GESTURE_ENDED = "gesture_ended"
+PINCH = "pinch"
+PINCH_RELEASED = "pinch_released"
+
+
+class GestureEvent:
+	__slots__ = ("kind", "hand", "name", "timestamp", "value")
+
+	def __init__(self, kind, hand, name, timestamp, value=None):
+		self.kind = kind
+		self.hand = hand
+		self.name = name
+		self.timestamp = timestamp
+		self.value = value
+
+	def __repr__(self):
+		return f"GestureEvent({self.kind}, {self.hand}, {self.name})"
+
+
+class EdgeTrigger:
+	__slots__ = ("on", "off", "hold_time", "above", "active", "since")
+
+	def __init__(self, on, off=None, hold_time=0.0, above=True):
+		self.on = on
+		self.off = on if off is None else off
+		self.hold_time = hold_time
+		self.above = above
+		self.active = False
+		self.since = None
+
+	def update(self, value, now=None):
+		now = time.perf_counter() if now is None else now
+
+		# Separate on and off thresholds stop a value hovering at the boundary from toggling every frame.
+		if value is None:
+			target = False
+		elif self.above:
+			target = value >= self.off if self.active else value >= self.on
+		else:
+			target = value <= self.off if self.active else value <= self.on
+
+		if target == self.active:
+			self.since = None
+			return None
+
+		if self.since is None:
+			self.since = now
+		if now - self.since < self.hold_time:
+			return None
+
+		self.active = target
+		self.since = None
+		return target
+
+	def reset(self):
+		self.active = False
+		self.since = None
+
+
+class HandTrack:
+	__slots__ = ("active", "candidate", "since")
+
+	def __init__(self):
+		self.active = "None"
+		self.candidate = "None"
+		self.since = 0.0
+
+
+class Pinch:
+	__slots__ = ("name", "hand", "a", "b", "trigger")
+
+	def __init__(self, name, hand, a, b, trigger):
+		self.name = name
+		self.hand = hand
+		self.a = a
+		self.b = b
+		self.trigger = trigger
+
+
+class GestureEventBus:
+	def __init__(self, hold_time=0.1, release_time=0.15):
+		self.hold_time = hold_time
+		self.release_time = release_time
+		self.tracks = {}
+		self.pinches = []
+		self.handlers = []
+
+	def on(self, kind, callback, hand=None, name=None):
+		handler = (kind, hand, name, callback)
+		self.handlers.append(handler)
+		return handler
+
+	def off(self, handler):
+		if handler in self.handlers:
+			self.handlers.remove(handler)
+
+	def subscribe_async(self, kind=None, hand=None, name=None, maxsize=64):
+		loop = asyncio.get_running_loop()
+		queue = asyncio.Queue(maxsize)
+
+		def put(event):
+			# A consumer that falls behind loses its oldest events rather than stalling the capture loop.
+			if queue.full():
+				queue.get_nowait()
+			queue.put_nowait(event)
+
+		self.on(kind, lambda event: loop.call_soon_threadsafe(put, event), hand, name)
+		return queue
+
+	async def events(self, kind=None, hand=None, name=None, maxsize=64):
+		queue = self.subscribe_async(kind, hand, name, maxsize)
+		while True:
+			yield await queue.get()
+
+	def add_pinch(self, name, hand, a=4, b=8, on=30, off=None, hold_time=0.0):
+		trigger = EdgeTrigger(on, on * 1.5 if off is None else off, hold_time, above=False)
+		self.pinches.append(Pinch(name, hand, a, b, trigger))
+
+	def emit(self, event):
+		for kind, hand, name, callback in self.handlers:
+			if (kind is None or kind == event.kind) and (hand is None or hand == event.hand) and (name is None or name == event.name):
+				callback(event)
+
+	def update(self, hand_state, now=None):
+		now = time.perf_counter() if now is None else now
+		events = []
+
+		for meta in hand_state.meta:
+			track = self.tracks.get(meta.label)
+			if track is None:
+				track = self.tracks[meta.label] = HandTrack()
+
+			gesture = meta.gesture or "None"
+			if gesture == track.active:
+				track.candidate = gesture
+				continue
+
+			if gesture != track.candidate:
+				track.candidate = gesture
+				track.since = now
+
+			# A new gesture must be held before it counts, and letting go must last a little longer still,
+			# so a single misclassified frame neither starts nor ends anything.
+			hold = self.release_time if gesture == "None" else self.hold_time
+			if now - track.since < hold:
+				continue
+
+			if track.active != "None":
+				events.append(GestureEvent(GESTURE_ENDED, meta.label, track.active, now))
+			track.active = gesture
+			if gesture != "None":
+				events.append(GestureEvent(GESTURE_STARTED, meta.label, gesture, now))
+
+		for pinch in self.pinches:
+			distance = None
+			if hand_state.meta[hand_state.index[pinch.hand]].present:
+				distance = hand_state.distance(pinch.hand, pinch.a, pinch.b)
+
+			edge = pinch.trigger.update(distance, now)
+			if edge is not None:
+				events.append(GestureEvent(PINCH if edge else PINCH_RELEASED, pinch.hand, pinch.name, now, distance))
+
+		for event in events:
+			self.emit(event)
+		return events
+
+	def active_gesture(self, hand):
+		track = self.tracks.get(hand)
+		return track.active if track is not None else "None"
@@ -0,0 +1,73 @@
+import math
+import numpy as np
+
+
+class LandmarkFilter:
+	def __init__(self, hands=2, landmarks=21):
+		self.state = np.zeros((hands, landmarks, 3), dtype=np.float32)
+		self.velocity = np.zeros((hands, landmarks, 3), dtype=np.float32)
+		self.last_time = [None] * hands
+		self.horizon = 0.0
+
+	def reset(self, hand, measured, timestamp):
+		self.state[hand] = measured
+		self.velocity[hand] = 0
+		self.last_time[hand] = timestamp
+
+	def smooth(self, hand, measured, dt):
+		raise NotImplementedError
+
+	def update(self, hand, measured, timestamp, out, first=False):
+		last_time = self.last_time[hand]
+		if first or last_time is None or timestamp <= last_time:
+			self.reset(hand, measured, timestamp)
+		else:
+			self.smooth(hand, measured, timestamp - last_time)
+			self.last_time[hand] = timestamp
+
+		out[...] = self.state[hand]
+
+		# Extrapolate along the filtered velocity so consumers see where the hand is now, not where it was
+		# when the frame was captured. The filter's own state never includes the prediction.
+		if self.horizon > 0:
+			out += self.velocity[hand] * self.horizon
+
+
+class EmaFilter(LandmarkFilter):
+	def __init__(self, smoothing_factor=0.5, hands=2, landmarks=21):
+		super().__init__(hands, landmarks)
+		self.smoothing_factor = smoothing_factor
+
+	def smooth(self, hand, measured, dt):
+		previous = self.state[hand].copy()
+		self.state[hand] *= self.smoothing_factor
+		self.state[hand] += (1 - self.smoothing_factor) * measured
+		self.velocity[hand] = (self.state[hand] - previous) / dt
+
+
+class OneEuroFilter(LandmarkFilter):
+	def __init__(self, min_cutoff=1.0, beta=0.02, d_cutoff=1.0, hands=2, landmarks=21):
+		super().__init__(hands, landmarks)
+		self.min_cutoff = min_cutoff
+		self.beta = beta
+		self.d_cutoff = d_cutoff
+
+	@staticmethod
+	def alpha(cutoff, dt):
+		tau = 1.0 / (2 * math.pi * cutoff)
+		return 1.0 / (1.0 + tau / dt)
+
+	def smooth(self, hand, measured, dt):
+		state = self.state[hand]
+		velocity = self.velocity[hand]
+
+		raw_velocity = (measured - state) / dt
+		velocity += self.alpha(self.d_cutoff, dt) * (raw_velocity - velocity)
+
+		# Cutoff rises with each landmark's speed: heavy smoothing when still, little lag when moving fast.
+		speed = np.sqrt(velocity[:, 0] ** 2 + velocity[:, 1] ** 2)[:, None]
+		cutoff = self.min_cutoff + self.beta * speed
+		tau = 1.0 / (2 * math.pi * cutoff)
+		alpha = 1.0 / (1.0 + tau / dt)
+
+		state += alpha * (measured - state)
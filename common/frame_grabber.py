@@ -0,0 +1,100 @@
+import cv2
+import threading
+import time
+
+
+class FrameGrabber:
+	def __init__(self, cap, read_timeout=None, startup_timeout=5.0):
+		self.cap = cap
+		fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+		self.read_timeout = read_timeout if read_timeout is not None else 1.0 / fps
+		self.startup_timeout = startup_timeout
+
+		# Triple buffer: the grabber fills `back`, publishes it as `ready`, and the caller owns `front`
+		# until its next read_latest() call, so no frame is ever copied or written while in use.
+		self.back = None
+		self.ready = None
+		self.front = None
+		self.ready_time = None
+		self.front_time = None
+		# False when the last read_latest() timed out and handed back the previous, already returned frame.
+		self.fresh = False
+
+		self.condition = threading.Condition()
+		self.frame_id = 0
+		self.read_id = 0
+		self.failed = False
+		self.running = False
+		self.thread = None
+
+		self.captured = 0
+		self.dropped = 0
+		self.capture_fps = 0.0
+		self.window_start = time.perf_counter()
+		self.window_count = 0
+
+	def start(self):
+		self.running = True
+		self.thread = threading.Thread(target=self.loop, daemon=True)
+		self.thread.start()
+		return self
+
+	def loop(self):
+		try:
+			while self.running:
+				ret, frame = self.cap.read(self.back) if self.back is not None else self.cap.read()
+				if not ret:
+					break
+				captured_at = time.perf_counter()
+
+				with self.condition:
+					if self.frame_id != self.read_id:
+						self.dropped += 1
+					self.back, self.ready = self.ready, frame
+					self.ready_time = captured_at
+					self.frame_id += 1
+					self.captured += 1
+					self.condition.notify_all()
+
+				self.update_fps()
+		except Exception as e:
+			print(f"Error in frame grabber: {e}")
+		finally:
+			with self.condition:
+				self.failed = True
+				self.condition.notify_all()
+
+	def update_fps(self):
+		self.window_count += 1
+		now = time.perf_counter()
+		elapsed = now - self.window_start
+		if elapsed >= 1.0:
+			self.capture_fps = self.window_count / elapsed
+			self.window_start = now
+			self.window_count = 0
+
+	def read_latest(self):
+		with self.condition:
+			if self.frame_id == self.read_id and not self.failed:
+				self.condition.wait(self.read_timeout if self.frame_id else self.startup_timeout)
+
+			if self.frame_id != self.read_id:
+				self.front, self.ready = self.ready, self.front
+				self.front_time = self.ready_time
+				self.read_id = self.frame_id
+				self.fresh = True
+			elif self.failed:
+				return False, None
+			else:
+				self.fresh = False
+
+			return self.front is not None, self.front
+
+	def stats(self):
+		return {"capture_fps": self.capture_fps, "captured": self.captured, "dropped": self.dropped}
+
+	def stop(self):
+		self.running = False
+		if self.thread is not None:
+			self.thread.join(timeout=1.0)
+			self.thread = None
@@ -0,0 +1,239 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from frame_grabber import FrameGrabber
+
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"}
+
+
+def list_images(folder):
+	names = sorted(name for name in os.listdir(folder) if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+	return [os.path.join(folder, name) for name in names]
+
+
+class Pacer:
+	def __init__(self, fps, realtime):
+		self.interval = 1.0 / fps if fps else 0.0
+		self.realtime = realtime
+		self.start = None
+		self.count = 0
+
+	def wait(self):
+		if not self.realtime or not self.interval:
+			return
+		if self.start is None:
+			self.start = time.perf_counter()
+
+		# Sleep against the ideal schedule rather than the previous frame, so pacing error does not accumulate.
+		delay = self.start + self.count * self.interval - time.perf_counter()
+		if delay > 0:
+			time.sleep(delay)
+		self.count += 1
+
+
+class FrameSource:
+	fps = 30.0
+	color_order = "BGR"
+	# perf_counter() time the last frame was captured, for sources that know it; None means "when read() returned".
+	capture_time = None
+	# Whether the last read() returned a new frame; a camera running below its reported fps can repeat one.
+	fresh = True
+
+	def read(self):
+		raise NotImplementedError
+
+	def read_latest(self):
+		return self.read()
+
+	def stats(self):
+		return None
+
+	def isOpened(self):
+		return True
+
+	def release(self):
+		pass
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.release()
+
+
+class CameraSource(FrameSource):
+	def __init__(self, index=0, width=None, height=None, fourcc=None, api=None, threaded=True):
+		# DirectShow is only available on Windows; elsewhere let OpenCV pick the backend.
+		if api is None:
+			api = cv2.CAP_DSHOW if sys.platform == "win32" else cv2.CAP_ANY
+
+		self.cap = cv2.VideoCapture(index, api)
+		if fourcc:
+			self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+		if width:
+			self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+		if height:
+			self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+		self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+		self.grabber = FrameGrabber(self.cap).start() if threaded and self.cap.isOpened() else None
+
+	def read(self):
+		if self.grabber is not None:
+			ret, frame = self.grabber.read_latest()
+			self.capture_time = self.grabber.front_time
+			self.fresh = self.grabber.fresh
+			return ret, frame
+		ret, frame = self.cap.read()
+		self.capture_time = time.perf_counter()
+		return ret, frame
+
+	def stats(self):
+		return self.grabber.stats() if self.grabber is not None else None
+
+	def isOpened(self):
+		return self.cap.isOpened()
+
+	def release(self):
+		if self.grabber is not None:
+			self.grabber.stop()
+		self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+	def __init__(self, path, realtime=False, loop=False, start=0, stop=None):
+		self.path = path
+		self.loop = loop
+		self.cap = cv2.VideoCapture(path)
+		self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+		self.pacer = Pacer(self.fps, realtime)
+
+		# Only frames [start, stop) are read, so a long file can be split into chunks that each open their own source.
+		self.start = start
+		self.stop = stop
+		self.index = 0
+		self.seek(start)
+
+	def seek(self, index):
+		if index != self.index:
+			self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+		self.index = index
+
+	def read(self):
+		if self.stop is not None and self.index >= self.stop:
+			if not self.loop:
+				return False, None
+			self.seek(self.start)
+
+		ret, frame = self.cap.read()
+		if not ret and self.loop:
+			self.seek(self.start)
+			ret, frame = self.cap.read()
+		if ret:
+			self.index += 1
+			self.pacer.wait()
+		return ret, frame
+
+	def isOpened(self):
+		return self.cap.isOpened()
+
+	def release(self):
+		self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+	def __init__(self, paths, fps=30.0, realtime=False, loop=False):
+		if isinstance(paths, str):
+			paths = list_images(paths)
+
+		self.paths = list(paths)
+		self.fps = fps
+		self.loop = loop
+		self.index = 0
+		self.path = None
+		self.pacer = Pacer(fps, realtime)
+
+	def read(self):
+		for _ in range(len(self.paths)):
+			if self.index >= len(self.paths):
+				if not self.loop:
+					return False, None
+				self.index = 0
+
+			self.path = self.paths[self.index]
+			self.index += 1
+			frame = cv2.imread(self.path)
+			if frame is not None:
+				self.pacer.wait()
+				return True, frame
+
+			# One unreadable file is skipped rather than ending the whole sequence.
+			print(f"Error: Could not read {self.path}.")
+		return False, None
+
+	def isOpened(self):
+		return bool(self.paths)
+
+
+class SyntheticSource(FrameSource):
+	def __init__(self, width=1280, height=720, frames=None, fps=30.0, realtime=False, seed=0, rgb=False):
+		self.color_order = "RGB" if rgb else "BGR"
+		self.width = width
+		self.height = height
+		self.frames = frames
+		self.fps = fps
+		self.index = 0
+		self.pacer = Pacer(fps, realtime)
+
+		# The background is fixed per seed, so every replay produces bit-identical frames.
+		rng = np.random.default_rng(seed)
+		self.background = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+
+	def read(self):
+		if self.frames is not None and self.index >= self.frames:
+			return False, None
+
+		t = self.index / self.fps
+		frame = self.background.copy()
+
+		center = (
+			int(self.width / 2 + self.width / 3 * np.cos(t)),
+			int(self.height / 2 + self.height / 3 * np.sin(2 * t)),
+		)
+		color = (220, 140, 60) if self.color_order == "RGB" else (60, 140, 220)
+		cv2.circle(frame, center, self.height // 10, color, cv2.FILLED)
+		cv2.putText(frame, str(self.index), (10, self.height - 20), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+
+		self.index += 1
+		self.pacer.wait()
+		return True, frame
+
+
+def open_source(spec=0, width=None, height=None, realtime=False, loop=False, threaded=True, rgb=False):
+	if isinstance(spec, FrameSource):
+		return spec
+
+	spec = str(spec)
+	if spec.isdigit():
+		return CameraSource(int(spec), width, height, threaded=threaded)
+	if spec.startswith("synthetic"):
+		size = spec.partition(":")[2]
+		if size:
+			width, height = (int(value) for value in size.lower().split("x"))
+		return SyntheticSource(width or 1280, height or 720, realtime=realtime, rgb=rgb)
+	if os.path.isdir(spec):
+		return ImageSequenceSource(spec, realtime=realtime, loop=loop)
+	return VideoFileSource(spec, realtime=realtime, loop=loop)
+
+
+def parse_cli(argv, **source_kwargs):
+	headless = "--headless" in argv
+	realtime = "--realtime" in argv
+	specs = [arg for arg in argv[1:] if not arg.startswith("--")]
+
+	# Headless runs never draw, so a source that can hand over RGB directly may as well do so.
+	source = open_source(specs[0], realtime=realtime, rgb=headless, **source_kwargs) if specs else None
+	return source, headless
@@ -0,0 +1,611 @@
+import cv2
+import sys
+import mediapipe as mp
+import threading
+import math
+import time
+import numpy as np
+from collections.abc import Mapping
+from mediapipe.tasks import python
+from frame_sources import CameraSource, parse_cli
+from telemetry import Telemetry, parse_telemetry
+from filters import EmaFilter
+from hud import Hud
+
+
+HAND_LABELS = ("Left", "Right")
+MIRRORED_LABELS = {"Left": "Right", "Right": "Left"}
+NUM_LANDMARKS = 21
+
+
+class HandMeta:
+	__slots__ = ("label", "present", "tracked", "gesture", "gesture_frame", "version", "cached_version", "cached_list")
+
+	def __init__(self, label):
+		self.label = label
+		self.present = False
+		self.tracked = False
+		self.gesture = "None"
+		self.gesture_frame = -1
+		self.version = 0
+		self.cached_version = -1
+		self.cached_list = []
+
+
+class HandState:
+	def __init__(self, landmark_filter=None):
+		self.filter = landmark_filter or EmaFilter(0.5, len(HAND_LABELS), NUM_LANDMARKS)
+		# Filtered pixel-space landmarks for both hands: [hand, landmark, (x, y, z)].
+		self.landmarks = np.zeros((len(HAND_LABELS), NUM_LANDMARKS, 3), dtype=np.float32)
+		self.measured = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+		self.meta = [HandMeta(label) for label in HAND_LABELS]
+		self.index = {label: i for i, label in enumerate(HAND_LABELS)}
+		# When set, landmarks are reflected about this frame width, as if the frame had been flipped.
+		self.mirror_width = None
+
+		# Pairwise geometry between every landmark of each hand: deltas[hand, a, b] = point[b] - point[a].
+		self.deltas = np.zeros((len(HAND_LABELS), NUM_LANDMARKS, NUM_LANDMARKS, 2), dtype=np.float32)
+		self.distances = np.zeros((len(HAND_LABELS), NUM_LANDMARKS, NUM_LANDMARKS), dtype=np.float32)
+		self.angles = np.zeros((len(HAND_LABELS), NUM_LANDMARKS, NUM_LANDMARKS), dtype=np.float32)
+		self.geometry_versions = None
+
+	def clear(self):
+		# clear() runs before the frame's update() calls, so remember which hands were seen last frame.
+		for meta in self.meta:
+			meta.tracked = meta.present
+			if meta.present:
+				meta.present = False
+				meta.version += 1
+
+	def update(self, label, landmarks, x0, y0, width, height, timestamp=None):
+		i = self.index[label]
+		meta = self.meta[i]
+
+		measured = self.measured
+		measured.ravel()[:] = np.fromiter(
+			(value for lm in landmarks for value in (lm.x, lm.y, lm.z)),
+			dtype=np.float32, count=NUM_LANDMARKS * 3
+		)
+		measured[:, 0] *= width
+		measured[:, 0] += x0
+		measured[:, 1] *= height
+		measured[:, 1] += y0
+		if self.mirror_width is not None:
+			measured[:, 0] = self.mirror_width - measured[:, 0]
+
+		timestamp = time.perf_counter() if timestamp is None else timestamp
+		self.filter.update(i, measured, timestamp, self.landmarks[i], first=not meta.tracked)
+
+		meta.present = True
+		meta.version += 1
+
+	def bounds(self):
+		present = [i for i, meta in enumerate(self.meta) if meta.present]
+		if not present:
+			return None
+
+		points = self.landmarks[present, :, :2].reshape(-1, 2)
+		x_min, y_min = points.min(axis=0)
+		x_max, y_max = points.max(axis=0)
+		return float(x_min), float(y_min), float(x_max), float(y_max)
+
+	def update_geometry(self):
+		versions = tuple(meta.version for meta in self.meta)
+		if versions == self.geometry_versions:
+			return
+
+		# One vectorized pass per frame covers every pair, so each distance or angle query is just an index.
+		points = self.landmarks[:, :, :2]
+		np.subtract(points[:, None, :, :], points[:, :, None, :], out=self.deltas)
+		np.hypot(self.deltas[..., 0], self.deltas[..., 1], out=self.distances)
+		np.arctan2(self.deltas[..., 1], self.deltas[..., 0], out=self.angles)
+		self.geometry_versions = versions
+
+	def distance(self, label, a, b):
+		self.update_geometry()
+		return float(self.distances[self.index[label], a, b])
+
+	def angle(self, label, a, b):
+		self.update_geometry()
+		return math.degrees(self.angles[self.index[label], a, b])
+
+	def landmark_list(self, label):
+		meta = self.meta[self.index[label]]
+		if not meta.present:
+			return []
+
+		if meta.cached_version != meta.version:
+			points = self.landmarks[self.index[label], :, :2].astype(np.int32).tolist()
+			meta.cached_list = [[id, x, y, label] for id, (x, y) in enumerate(points)]
+			meta.cached_version = meta.version
+		return meta.cached_list
+
+
+class HandView(Mapping):
+	__slots__ = ("state", "label")
+	KEYS = ("landmarks", "gesture", "gesture_frame")
+
+	def __init__(self, state, label):
+		self.state = state
+		self.label = label
+
+	def __getitem__(self, key):
+		if key == "landmarks":
+			return self.state.landmark_list(self.label)
+		if key == "gesture":
+			return self.state.meta[self.state.index[self.label]].gesture
+		if key == "gesture_frame":
+			return self.state.meta[self.state.index[self.label]].gesture_frame
+		raise KeyError(key)
+
+	def __iter__(self):
+		return iter(self.KEYS)
+
+	def __len__(self):
+		return len(self.KEYS)
+
+
+class HandDataView(Mapping):
+	__slots__ = ("hands",)
+
+	def __init__(self, state):
+		self.hands = {label: HandView(state, label) for label in HAND_LABELS}
+
+	def __getitem__(self, label):
+		return self.hands[label]
+
+	def __iter__(self):
+		return iter(self.hands)
+
+	def __len__(self):
+		return len(self.hands)
+
+
+class GestureRecognizer:
+	def __init__(self, use_gestures=False, gesture_stride=2, gesture_timeout=0.5, threaded_capture=True,
+			inference_width=None, model_complexity=1, crop_mode=False, crop_padding=0.3, reacquire_interval=30,
+			backend="legacy", tasks_mode="video", camera_index=0, source=None, telemetry=None,
+			landmark_filter=None, predict_latency=False, prediction_offset=0.0, max_prediction=0.1,
+			headless=False, mirror=False, events=None):
+		try:
+			self.backend = backend
+			self.tasks_mode = tasks_mode
+			# The Tasks recognizer classifies gestures as part of the same pass that finds landmarks.
+			self.use_gesture_recognition = use_gestures or backend == "tasks"
+			self.num_hands = 2
+			self.tracking_confidence = 0.55
+			self.detection_confidence = 0.55
+			self.smoothing_factor = 0.5
+
+			self.frame_index = 0
+			self.headless = headless
+			self.mirror = mirror
+			self.telemetry = telemetry or Telemetry()
+			self.events = events
+			self.hud = Hud()
+
+			self.inference_width = inference_width
+			self.model_complexity = model_complexity
+			self.crop_mode = crop_mode
+			self.crop_padding = crop_padding
+			self.reacquire_interval = reacquire_interval
+			self.crop_region = None
+			self.frames_since_full = 0
+
+			self.predict_latency = predict_latency
+			self.prediction_offset = prediction_offset
+			self.max_prediction = max_prediction
+			self.frame_time = None
+			self.fresh = False
+			self.horizon_time = None
+			self.latency = 0.0
+			self.tail_latency = 0.0
+
+			self.hand_state = HandState(landmark_filter or EmaFilter(self.smoothing_factor))
+			self.hand_data = HandDataView(self.hand_state)
+
+			self.lock = threading.Lock()
+			self.gesture_stride = max(1, gesture_stride)
+			self.gesture_timeout = gesture_timeout
+			self.gesture_in_flight = False
+			self.gesture_submitted_at = 0.0
+			self.gesture_latest_timestamp = -1
+			# Each submitted request's frame index and region, keyed by the timestamp the callback reports back.
+			self.gesture_requests = {}
+			self.gestures_dropped = 0
+			self.pending_result = None
+			self.start_time = time.monotonic()
+			self.last_timestamp_ms = -1
+
+			self.hands = None
+			if backend == "tasks":
+				live_stream = tasks_mode == "live_stream"
+				self.recognizer = self.create_task_recognizer(live_stream)
+			else:
+				if use_gestures:
+					self.recognizer = self.create_task_recognizer(True)
+
+				self.mp_drawing = mp.solutions.drawing_utils
+				self.mp_hands = mp.solutions.hands
+				self.hands = self.mp_hands.Hands(
+					static_image_mode=False,
+					max_num_hands=self.num_hands,
+					min_detection_confidence=self.detection_confidence,
+					min_tracking_confidence=self.tracking_confidence,
+					model_complexity=self.model_complexity
+				)
+
+			if source is None:
+				source = CameraSource(camera_index, 1280, 960, threaded=threaded_capture)
+			self.source = source
+			self.cap = source
+
+			if not self.source.isOpened():
+				print("Error: Could not open video capture.")
+		except Exception as e:
+			print(f"Error initializing GestureRecognizer: {e}")
+
+	def create_task_recognizer(self, live_stream):
+		model_path = "../models/gesture_recognizer.task"
+		GestureRecognizer = mp.tasks.vision.GestureRecognizer
+		GestureRecognizerOptions = mp.tasks.vision.GestureRecognizerOptions
+		VisionRunningMode = mp.tasks.vision.RunningMode
+
+		options = GestureRecognizerOptions(
+			base_options=python.BaseOptions(model_asset_path=model_path),
+			running_mode=VisionRunningMode.LIVE_STREAM if live_stream else VisionRunningMode.VIDEO,
+			num_hands=self.num_hands,
+			min_hand_detection_confidence=self.detection_confidence,
+			min_tracking_confidence=self.tracking_confidence,
+			result_callback=self.results_callback if live_stream else None
+		)
+		return GestureRecognizer.create_from_options(options)
+
+	def process_hands(self, results, region):
+		self.update_horizon()
+		state = self.hand_state
+		state.clear()
+
+		if not results.multi_hand_landmarks or not results.multi_handedness:
+			for meta in state.meta:
+				meta.gesture = "None"
+			return
+
+		x0, y0, w, h = region
+		for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+			label = self.hand_label(handedness.classification[0].label)
+			state.update(label, hand_landmarks.landmark, x0, y0, w, h)
+
+	def process_task_result(self, result, region, frame_index):
+		self.update_horizon()
+		state = self.hand_state
+		state.clear()
+
+		x0, y0, w, h = region
+		seen = set()
+		for index, hand in enumerate(result.handedness):
+			label = self.hand_label(hand[0].category_name)
+			state.update(label, result.hand_landmarks[index], x0, y0, w, h)
+
+			meta = state.meta[state.index[label]]
+			meta.gesture = result.gestures[index][0].category_name if result.gestures[index] else "None"
+			meta.gesture_frame = frame_index
+			seen.add(label)
+
+		for meta in state.meta:
+			if meta.label not in seen:
+				meta.gesture = "None"
+				meta.gesture_frame = frame_index
+
+	def hand_label(self, label):
+		# Flipping an image swaps which hand MediaPipe reports, so an unflipped mirror frame swaps labels back.
+		return MIRRORED_LABELS[label] if self.mirror else label
+
+	def inference_region(self, frame_w, frame_h):
+		if not self.crop_mode:
+			return 0, 0, frame_w, frame_h
+
+		bounds = self.hand_state.bounds()
+		self.frames_since_full += 1
+		if bounds is None or self.frames_since_full >= self.reacquire_interval:
+			self.crop_region = None
+			self.frames_since_full = 0
+			return 0, 0, frame_w, frame_h
+
+		x_min, y_min, x_max, y_max = bounds
+		if self.mirror:
+			x_min, x_max = frame_w - x_max, frame_w - x_min
+
+		if self.crop_region is not None:
+			x0, y0, w, h = self.crop_region
+			margin = self.crop_padding * max(w, h) / 4
+
+			# Keep the crop still while the hands stay well inside it, so the tracker's coordinates stay stable.
+			if x_min >= x0 + margin and y_min >= y0 + margin and x_max <= x0 + w - margin and y_max <= y0 + h - margin:
+				return self.crop_region
+
+		size = max(x_max - x_min, y_max - y_min)
+		pad = self.crop_padding * size + 32
+		x0, y0 = max(0, int(x_min - pad)), max(0, int(y_min - pad))
+		x1, y1 = min(frame_w, int(x_max + pad)), min(frame_h, int(y_max + pad))
+		self.crop_region = (x0, y0, x1 - x0, y1 - y0)
+		return self.crop_region
+
+	def to_rgb(self, image):
+		# Sources that already deliver RGB (see FrameSource.color_order) skip the conversion copy entirely.
+		if self.source.color_order == "RGB":
+			return np.ascontiguousarray(image)
+		return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+	def scale_for_inference(self, image):
+		h, w = image.shape[:2]
+		if not self.inference_width or w <= self.inference_width:
+			return image
+
+		scale = self.inference_width / w
+		return cv2.resize(image, (self.inference_width, max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+	def begin_request(self, region):
+		now = time.monotonic()
+		with self.lock:
+			# Only one request is ever in flight; frames that arrive meanwhile are skipped rather than queued.
+			if self.gesture_in_flight and now - self.gesture_submitted_at < self.gesture_timeout:
+				self.gestures_dropped += 1
+				return None
+			timestamp_ms = self.next_timestamp(now)
+			self.gesture_in_flight = True
+			self.gesture_submitted_at = now
+			self.gesture_latest_timestamp = timestamp_ms
+			self.gesture_requests[timestamp_ms] = (self.frame_index, region)
+
+		return timestamp_ms
+
+	def next_timestamp(self, now=None):
+		now = time.monotonic() if now is None else now
+		timestamp_ms = max(int((now - self.start_time) * 1000), self.last_timestamp_ms + 1)
+		self.last_timestamp_ms = timestamp_ms
+		return timestamp_ms
+
+	def submit_gesture_frame(self, frame):
+		if self.frame_index % self.gesture_stride:
+			return
+
+		timestamp_ms = self.begin_request((0, 0, frame.shape[1], frame.shape[0]))
+		if timestamp_ms is None:
+			return
+
+		frame_rgb = self.to_rgb(self.scale_for_inference(frame))
+		mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb)
+		self.recognizer.recognize_async(mp_image, timestamp_ms)
+
+	def run_tasks(self, inference_image, region):
+		telemetry = self.telemetry
+		with telemetry.stage("color_convert"):
+			mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=self.to_rgb(inference_image))
+
+		if self.tasks_mode != "live_stream":
+			with telemetry.stage("inference"):
+				result = self.recognizer.recognize_for_video(mp_image, self.next_timestamp())
+			with telemetry.stage("landmarks"):
+				self.process_task_result(result, region, self.frame_index)
+			return
+
+		timestamp_ms = self.begin_request(region)
+		if timestamp_ms is not None:
+			with telemetry.stage("inference"):
+				self.recognizer.recognize_async(mp_image, timestamp_ms)
+
+		# Results arrive on MediaPipe's thread; they are applied here so hand state is only touched by the caller.
+		with self.lock:
+			pending, self.pending_result = self.pending_result, None
+		if pending is not None:
+			with telemetry.stage("landmarks"):
+				self.process_task_result(*pending)
+
+	def run(self, frame: cv2.typing.MatLike, draw_gestures: bool = True):
+		try:
+			self.frame_index += 1
+
+			if self.use_gesture_recognition and self.backend != "tasks":
+				self.submit_gesture_frame(frame)
+
+			frame_h, frame_w = frame.shape[:2]
+			self.hand_state.mirror_width = frame_w if self.mirror else None
+			region = self.inference_region(frame_w, frame_h)
+			x0, y0, w, h = region
+
+			# Crop and downscale before the color conversion so only the pixels inference sees are converted.
+			inference_image = self.scale_for_inference(frame[y0:y0 + h, x0:x0 + w])
+
+			telemetry = self.telemetry
+			if self.backend == "tasks":
+				self.run_tasks(inference_image, region)
+			else:
+				with telemetry.stage("color_convert"):
+					inference_rgb = self.to_rgb(inference_image)
+				with telemetry.stage("inference"):
+					results = self.hands.process(inference_rgb)
+				with telemetry.stage("landmarks"):
+					self.process_hands(results, region)
+
+			self.update_prediction()
+
+			if self.events is not None:
+				with telemetry.stage("events"):
+					self.events.update(self.hand_state)
+
+			# for hand_label in ["Left", "Right"]:
+			# 	landmarks = self.hand_data[hand_label]["landmarks"]
+			# 	if landmarks:
+			# 		for lm in landmarks:
+			# 			cv2.circle(frame, (lm[1], lm[2]), 6, (255, 0, 0), cv2.FILLED)
+
+			# 		x_min = min([lm[1] for lm in landmarks])
+			# 		y_min = min([lm[2] for lm in landmarks])
+			# 		x_max = max([lm[1] for lm in landmarks])
+			# 		y_max = max([lm[2] for lm in landmarks])
+
+			# 		cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
+
+			if draw_gestures and self.use_gesture_recognition and not self.headless:
+				with telemetry.stage("draw"):
+					left_gesture = self.hand_data["Left"]["gesture"]
+					right_gesture = self.hand_data["Right"]["gesture"]
+
+					self.hud.text(f"Left Hand: {left_gesture}", (10, 50), scale=1, color=(0, 0, 255), thickness=2)
+					self.hud.text(f"Right Hand: {right_gesture}", (10, 100), scale=1, color=(0, 0, 255), thickness=2)
+					self.hud.flush(frame)
+
+			return frame, self.hand_data
+		except Exception as e:
+			print(f"Error in run: {e}")
+
+	def landmark_list(self, label):
+		# One hand's landmarks as [id, x, y, label] rows, so a landmark index always refers to that hand.
+		return self.hand_state.landmark_list(label)
+
+	def check_landmark_handedness(self, landmark_ids, label):
+		landmarks = self.hand_state.landmark_list(label)
+		return all(id < len(landmarks) for id in landmark_ids)
+
+	def resolve_hand(self, hand):
+		if hand is None:
+			return next((meta.label for meta in self.hand_state.meta if meta.present), None)
+		return hand if self.hand_state.meta[self.hand_state.index[hand]].present else None
+
+	def length_between_landmarks(self, frame, landmark_1, landmark_2, hand=None, draw=True, threshold=100):
+		label = self.resolve_hand(hand)
+		if label is None:
+			return 0, False
+
+		length = self.hand_state.distance(label, landmark_1, landmark_2)
+		is_active = length < threshold
+
+		# Drawing is queued on self.hud; callers flush it once per frame together with their own overlay.
+		if draw and not self.headless:
+			landmarks = self.hand_state.landmark_list(label)
+			x1, y1 = landmarks[landmark_1][1], landmarks[landmark_1][2]
+			x2, y2 = landmarks[landmark_2][1], landmarks[landmark_2][2]
+			color = (0, 255, 0) if is_active else (0, 0, 255)
+
+			self.hud.line((x1, y1), (x2, y2), color, 3)
+			self.hud.circle((x1, y1), 8, color)
+			self.hud.circle((x2, y2), 8, color)
+			self.hud.circle(((x1 + x2) // 2, (y1 + y2) // 2), 6, (255, 255, 255))
+
+		return int(length), is_active
+
+	def angle_between_landmarks(self, landmark_1, landmark_2, hand=None):
+		label = self.resolve_hand(hand)
+		if label is None:
+			return None
+		return self.hand_state.angle(label, landmark_1, landmark_2)
+
+	def results_callback(self, result, output_image, timestamp_ms):
+		try:
+			with self.lock:
+				request = self.gesture_requests.pop(timestamp_ms, None)
+				# Results arrive in timestamp order, so anything older than this one will never be answered.
+				for stale in [ts for ts in self.gesture_requests if ts < timestamp_ms]:
+					del self.gesture_requests[stale]
+				if request is None:
+					return
+
+				# A late answer to a timed-out request must not release the slot held by the newer one.
+				if timestamp_ms == self.gesture_latest_timestamp:
+					self.gesture_in_flight = False
+				frame_index, region = request
+
+				if self.backend == "tasks":
+					self.pending_result = (result, region, frame_index)
+					return
+
+				seen = set()
+
+				if result and any(result.gestures):
+					for index, hand in enumerate(result.handedness):
+						hand_name = self.hand_label(hand[0].category_name)
+						meta = self.hand_state.meta[self.hand_state.index[hand_name]]
+						meta.gesture = result.gestures[index][0].category_name
+						meta.gesture_frame = frame_index
+						seen.add(hand_name)
+
+				for meta in self.hand_state.meta:
+					if meta.label not in seen:
+						meta.gesture = "None"
+						meta.gesture_frame = frame_index
+		except Exception as e:
+			print(f"Error in results_callback: {e}")
+
+	def read_latest(self):
+		with self.telemetry.stage("capture"):
+			ret, frame = self.source.read()
+		# Grabbed frames carry the time they left the camera, so latency includes the time they waited in the buffer.
+		self.frame_time = self.source.capture_time or time.perf_counter()
+		self.fresh = self.source.fresh
+		return ret, frame
+
+	def update_horizon(self):
+		if not self.predict_latency or self.frame_time is None:
+			return
+
+		# Set just before the landmarks are filtered: this frame's age so far is known exactly, and only the
+		# work after filtering still has to be estimated from earlier frames.
+		self.horizon_time = time.perf_counter()
+		age = self.horizon_time - self.frame_time
+		self.hand_state.filter.horizon = min(self.max_prediction, age + self.tail_latency + self.prediction_offset)
+
+	def update_prediction(self):
+		if not self.predict_latency or self.frame_time is None:
+			return
+
+		# Latency from capture to filtered landmarks, smoothed so one slow frame does not jerk the estimate.
+		now = time.perf_counter()
+		self.latency += 0.1 * ((now - self.frame_time) - self.latency)
+		if self.horizon_time is not None:
+			self.tail_latency += 0.1 * ((now - self.horizon_time) - self.tail_latency)
+
+	def capture_stats(self):
+		return self.source.stats()
+
+	def cleanup(self):
+		try:
+			self.source.release()
+			if not self.headless:
+				cv2.destroyAllWindows()
+		except Exception as e:
+			print(f"Error in cleanup: {e}")
+
+if __name__ == "__main__":
+	try:
+		source, headless = parse_cli(sys.argv)
+		telemetry = parse_telemetry(sys.argv)
+		gesture_recognizer = GestureRecognizer(use_gestures=True, source=source, telemetry=telemetry, headless=headless)
+
+		while True:
+			ret, frame = gesture_recognizer.read_latest()
+			if not ret:
+				print("Error: Could not read frame.")
+				break
+			# A repeat is the previous buffer, already annotated; running it again would feed the filters a stale sample.
+			if not gesture_recognizer.fresh:
+				continue
+
+			frame, hand_data = gesture_recognizer.run(frame)
+			telemetry.frame_done()
+
+			if headless:
+				continue
+
+			telemetry.draw(frame, (10, 150))
+
+			with telemetry.stage("display"):
+				cv2.imshow("Gesture Recognizer", frame)
+				key = cv2.waitKey(1) & 0xFF
+
+			if key == ord('q'):
+				break
+
+		gesture_recognizer.cleanup()
+	except Exception as e:
+		print(f"Error in main loop: {e}")
@@ -0,0 +1,129 @@
+import collections
+import cv2
+import numpy as np
+
+
+class TextSprite:
+	__slots__ = ("premultiplied", "inverse_alpha", "width", "height", "pad")
+
+	def __init__(self, premultiplied, inverse_alpha, width, height, pad):
+		self.premultiplied = premultiplied
+		self.inverse_alpha = inverse_alpha
+		self.width = width
+		self.height = height
+		self.pad = pad
+
+
+class SpriteCache:
+	def __init__(self, capacity=256):
+		self.capacity = capacity
+		self.sprites = collections.OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, text, font, scale, color, thickness=1, border=False, line_type=cv2.LINE_AA):
+		# Only stable labels belong here: text that changes every frame (timings, counters) would rasterize
+		# a new sprite per frame and push useful entries out, so draw that with cv2.putText instead.
+		key = (text, font, scale, tuple(int(c) for c in color), thickness, border, line_type)
+		sprite = self.sprites.get(key)
+		if sprite is not None:
+			self.sprites.move_to_end(key)
+			self.hits += 1
+			return sprite
+
+		self.misses += 1
+		sprite = self.sprites[key] = self.rasterize(*key)
+		if len(self.sprites) > self.capacity:
+			self.sprites.popitem(last=False)
+		return sprite
+
+	@staticmethod
+	def rasterize(text, font, scale, color, thickness, border, line_type):
+		(width, height), baseline = cv2.getTextSize(text, font, scale, thickness)
+		outline = thickness * 3 if border else thickness
+		pad = outline // 2 + 2
+		shape = (height + baseline + 2 * pad, width + 2 * pad)
+		origin = (pad, pad + height)
+
+		fill = np.zeros(shape, dtype=np.uint8)
+		cv2.putText(fill, text, origin, font, scale, 255, thickness, line_type)
+		alpha = fill
+		if border:
+			alpha = np.zeros(shape, dtype=np.uint8)
+			cv2.putText(alpha, text, origin, font, scale, 255, outline, line_type)
+			np.maximum(alpha, fill, out=alpha)
+
+		# The border is black, so only the fill contributes color; premultiplying here leaves one multiply-add per blit.
+		premultiplied = fill[:, :, None].astype(np.uint16) * np.array(color, dtype=np.uint16)
+		inverse_alpha = (255 - alpha)[:, :, None].astype(np.uint16)
+		return TextSprite(premultiplied, inverse_alpha, width, height, pad)
+
+
+def blit(frame, sprite, x, y):
+	h, w = sprite.inverse_alpha.shape[:2]
+	frame_h, frame_w = frame.shape[:2]
+	x0, y0 = max(x, 0), max(y, 0)
+	x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+	if x0 >= x1 or y0 >= y1:
+		return
+
+	# Only the sprite's bounding box is touched, with the same exact divide-by-255 rounding as the compositor.
+	sx, sy = x0 - x, y0 - y
+	roi = frame[y0:y1, x0:x1]
+	blended = roi.astype(np.uint16) * sprite.inverse_alpha[sy:sy + y1 - y0, sx:sx + x1 - x0]
+	blended += sprite.premultiplied[sy:sy + y1 - y0, sx:sx + x1 - x0]
+	blended += 128
+	blended += blended >> 8
+	blended >>= 8
+	roi[...] = blended
+
+
+DEFAULT_CACHE = SpriteCache()
+
+
+def draw_text(frame, text, org, font=cv2.FONT_HERSHEY_SIMPLEX, scale=1.0, color=(255, 255, 255), thickness=1, border=False, anchor="left", cache=None, line_type=cv2.LINE_AA):
+	sprite = (cache or DEFAULT_CACHE).get(text, font, scale, color, thickness, border, line_type)
+	x, y = org
+	if anchor == "center":
+		x -= sprite.width // 2
+	# org is the text baseline, as with cv2.putText.
+	blit(frame, sprite, int(x) - sprite.pad, int(y) - sprite.height - sprite.pad)
+
+
+class Hud:
+	def __init__(self, cache=None, line_type=cv2.LINE_AA):
+		self.cache = cache or DEFAULT_CACHE
+		self.line_type = line_type
+		self.paths = collections.defaultdict(list)
+		self.circles = []
+		self.texts = []
+
+	def polyline(self, points, color, thickness=1, closed=True, border=False):
+		points = np.asarray(points, dtype=np.int32).reshape(-1, 1, 2)
+		key = (tuple(int(c) for c in color), thickness, closed)
+		if border:
+			self.paths[((0, 0, 0), thickness * 3, closed, True)].append(points)
+		self.paths[key + (False,)].append(points)
+
+	def line(self, pt1, pt2, color, thickness=1, border=False):
+		self.polyline((pt1, pt2), color, thickness, False, border)
+
+	def circle(self, center, radius, color, thickness=-1):
+		self.circles.append(((int(center[0]), int(center[1])), int(radius), color, thickness))
+
+	def text(self, text, org, font=cv2.FONT_HERSHEY_SIMPLEX, scale=1.0, color=(255, 255, 255), thickness=1, border=False, anchor="left"):
+		self.texts.append((text, org, font, scale, color, thickness, border, anchor))
+
+	def flush(self, frame):
+		# Paths that share a style go out in a single polylines call; borders are drawn first so strokes sit on top.
+		for (color, thickness, closed, _), paths in sorted(self.paths.items(), key=lambda item: not item[0][3]):
+			cv2.polylines(frame, paths, closed, color, thickness, self.line_type)
+		for center, radius, color, thickness in self.circles:
+			cv2.circle(frame, center, radius, color, thickness, self.line_type)
+		for text, org, font, scale, color, thickness, border, anchor in self.texts:
+			draw_text(frame, text, org, font, scale, color, thickness, border, anchor, self.cache, self.line_type)
+
+		self.paths.clear()
+		self.circles.clear()
+		self.texts.clear()
+		return frame
@@ -0,0 +1,158 @@
+import contextlib
+import csv
+import json
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+
+NULL_STAGE = contextlib.nullcontext()
+
+
+class RingBuffer:
+	__slots__ = ("values", "index", "count")
+
+	def __init__(self, capacity):
+		self.values = np.zeros(capacity, dtype=np.float32)
+		self.index = 0
+		self.count = 0
+
+	def add(self, value):
+		self.values[self.index] = value
+		self.index = (self.index + 1) % len(self.values)
+		self.count = min(self.count + 1, len(self.values))
+
+	def samples(self):
+		return self.values[:self.count]
+
+
+class StageTimer:
+	__slots__ = ("telemetry", "name", "start")
+
+	def __init__(self, telemetry, name):
+		self.telemetry = telemetry
+		self.name = name
+		self.start = 0
+
+	def __enter__(self):
+		self.start = time.perf_counter_ns()
+		return self
+
+	def __exit__(self, *exc):
+		self.telemetry.record(self.name, (time.perf_counter_ns() - self.start) / 1e6)
+
+
+class Telemetry:
+	def __init__(self, enabled=False, capacity=512, export_path=None, export_interval=5.0):
+		self.enabled = enabled
+		self.capacity = capacity
+		self.export_path = export_path
+		self.export_interval = export_interval
+
+		# Capture, detect and display threads may share one instance, so buffer creation and reads take this lock.
+		self.lock = threading.Lock()
+		self.buffers = {}
+		self.frame_start = None
+		self.lap_start = None
+		self.last_export = time.perf_counter()
+
+	def stage(self, name):
+		# Disabled telemetry hands back one shared no-op context, so instrumented code pays almost nothing.
+		# Enabled stages get their own timer, so nested or concurrent uses of one name never share a start time.
+		if not self.enabled:
+			return NULL_STAGE
+		return StageTimer(self, name)
+
+	def record(self, name, elapsed_ms):
+		with self.lock:
+			buffer = self.buffers.get(name)
+			if buffer is None:
+				buffer = self.buffers[name] = RingBuffer(self.capacity)
+			buffer.add(elapsed_ms)
+
+	def lap(self, name=None):
+		# Times straight-line code without re-indenting it: each named lap covers the time since the previous lap.
+		if not self.enabled:
+			return
+
+		now = time.perf_counter_ns()
+		if name is not None and self.lap_start is not None:
+			self.record(name, (now - self.lap_start) / 1e6)
+		self.lap_start = now
+
+	def frame_done(self):
+		if not self.enabled:
+			return
+
+		now = time.perf_counter_ns()
+		if self.frame_start is not None:
+			self.record("frame", (now - self.frame_start) / 1e6)
+		self.frame_start = now
+
+		if self.export_path and time.perf_counter() - self.last_export >= self.export_interval:
+			self.export()
+
+	def percentiles(self, name):
+		with self.lock:
+			buffer = self.buffers.get(name)
+			if buffer is None or buffer.count == 0:
+				return None
+			samples = buffer.samples().copy()
+
+		p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+		return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "mean": float(samples.mean()), "count": len(samples)}
+
+	def summary(self):
+		with self.lock:
+			names = list(self.buffers)
+		summary = {}
+		for name in names:
+			stats = self.percentiles(name)
+			if stats is not None:
+				summary[name] = stats
+		return summary
+
+	def fps(self):
+		frame = self.percentiles("frame")
+		return 1000.0 / frame["mean"] if frame and frame["mean"] > 0 else 0.0
+
+	def draw(self, frame, origin=(10, 30), color=(255, 255, 255)):
+		if not self.enabled:
+			return
+
+		x, y = origin
+		lines = [f"{self.fps():.1f} fps"]
+		for name, stats in self.summary().items():
+			lines.append(f"{name}: {stats['p50']:.1f} / {stats['p95']:.1f} / {stats['p99']:.1f} ms")
+
+		for i, line in enumerate(lines):
+			cv2.putText(frame, line, (x, y + i * 22), cv2.FONT_HERSHEY_SIMPLEX, 0.55, color, 1, cv2.LINE_AA)
+
+	def export(self, path=None):
+		path = path or self.export_path
+		timestamp = time.time()
+		summary = self.summary()
+
+		if path.lower().endswith(".csv"):
+			new_file = not os.path.exists(path)
+			with open(path, "a", newline="") as f:
+				writer = csv.writer(f)
+				if new_file:
+					writer.writerow(["timestamp", "stage", "p50", "p95", "p99", "mean", "count"])
+				for name, stats in summary.items():
+					writer.writerow([timestamp, name, stats["p50"], stats["p95"], stats["p99"], stats["mean"], stats["count"]])
+		else:
+			with open(path, "a") as f:
+				f.write(json.dumps({"timestamp": timestamp, "stages": summary}) + "\n")
+
+		self.last_export = time.perf_counter()
+
+
+def parse_telemetry(argv):
+	# --telemetry turns on stage timing and the overlay; --telemetry=path also appends summaries to a .jsonl or .csv file.
+	for arg in argv[1:]:
+		if arg == "--telemetry" or arg.startswith("--telemetry="):
+			return Telemetry(enabled=True, export_path=arg.partition("=")[2] or None)
+	return Telemetry()
@@ -0,0 +1,94 @@
+import pytest
+from events import EdgeTrigger, GestureEventBus, GESTURE_ENDED, GESTURE_STARTED, PINCH, PINCH_RELEASED
+
+
+class Meta:
+	def __init__(self, label):
+		self.label = label
+		self.gesture = "None"
+		self.present = True
+
+
+class StubHandState:
+	# Just the parts of HandState the bus reads: per-hand gesture and presence, plus a pinch distance.
+	def __init__(self):
+		self.meta = [Meta("Left"), Meta("Right")]
+		self.index = {"Left": 0, "Right": 1}
+		self.pinch_distance = 100.0
+
+	def distance(self, hand, a, b):
+		return self.pinch_distance
+
+
+@pytest.fixture
+def bus():
+	return GestureEventBus(hold_time=0.1, release_time=0.15)
+
+
+@pytest.fixture
+def hand_state():
+	return StubHandState()
+
+
+def feed(bus, hand_state, gestures, start=0.0, step=0.05):
+	# One update per gesture, `step` seconds apart, for the right hand.
+	events = []
+	for i, gesture in enumerate(gestures):
+		hand_state.meta[1].gesture = gesture
+		events += bus.update(hand_state, start + i * step)
+	return [(event.kind, event.name) for event in events]
+
+
+def test_gesture_starts_only_after_the_hold_time(bus, hand_state):
+	assert feed(bus, hand_state, ["Victory", "Victory"]) == []
+	assert feed(bus, hand_state, ["Victory"], start=0.1) == [(GESTURE_STARTED, "Victory")]
+	assert bus.active_gesture("Right") == "Victory"
+
+
+def test_single_misclassified_frame_is_ignored(bus, hand_state):
+	events = feed(bus, hand_state, ["Victory"] * 3 + ["Open_Palm"] + ["Victory"] * 4)
+
+	assert events == [(GESTURE_STARTED, "Victory")]
+
+
+def test_release_waits_longer_than_the_hold(bus, hand_state):
+	feed(bus, hand_state, ["Victory"] * 3)
+
+	assert feed(bus, hand_state, ["None"] * 3, start=0.15) == []
+	assert feed(bus, hand_state, ["None"], start=0.30) == [(GESTURE_ENDED, "Victory")]
+
+
+def test_switching_gestures_ends_the_old_one_first(bus, hand_state):
+	feed(bus, hand_state, ["Victory"] * 3)
+
+	assert feed(bus, hand_state, ["Open_Palm"] * 3, start=0.15) == [(GESTURE_ENDED, "Victory"), (GESTURE_STARTED, "Open_Palm")]
+
+
+def test_handlers_filter_by_hand_and_name(bus, hand_state):
+	received = []
+	bus.on(GESTURE_STARTED, received.append, hand="Right", name="Victory")
+	bus.on(GESTURE_STARTED, received.append, hand="Left")
+
+	feed(bus, hand_state, ["Victory"] * 3)
+	assert [(event.hand, event.name) for event in received] == [("Right", "Victory")]
+
+
+def test_pinch_has_hysteresis(bus, hand_state):
+	bus.add_pinch("laser", "Right", on=30)
+	kinds = []
+	for t, distance in enumerate([40, 29, 35, 44, 46]):
+		hand_state.pinch_distance = distance
+		kinds += [event.kind for event in bus.update(hand_state, t * 0.05)]
+
+	assert kinds == [PINCH, PINCH_RELEASED]
+
+
+def test_edge_trigger_requires_the_hold_time():
+	trigger = EdgeTrigger(on=3, off=2.75, hold_time=0.1)
+
+	assert trigger.update(3.5, now=0.0) is None
+	assert trigger.update(3.5, now=0.05) is None
+	assert trigger.update(3.5, now=0.1) is True
+	assert trigger.update(2.9, now=0.2) is None
+	assert trigger.update(2.5, now=0.3) is None
+	assert trigger.update(2.5, now=0.4) is False
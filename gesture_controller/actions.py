@@ -0,0 +1,149 @@
+import collections
+import threading
+import time
+import common_path  # puts ../common on sys.path
+from telemetry import Telemetry
+
+
+class PyAutoGuiBackend:
+	def __init__(self, pause=None):
+		import pyautogui
+
+		self.pyautogui = pyautogui
+		if pause is not None:
+			pyautogui.PAUSE = pause
+
+	def press(self, key):
+		self.pyautogui.press(key)
+
+	def hotkey(self, *keys):
+		self.pyautogui.hotkey(*keys)
+
+
+class RecordingBackend:
+	def __init__(self, capacity=1024):
+		self.calls = collections.deque(maxlen=capacity)
+
+	def press(self, key):
+		self.calls.append((time.perf_counter(), "press", (key,)))
+
+	def hotkey(self, *keys):
+		self.calls.append((time.perf_counter(), "hotkey", keys))
+
+
+class Action:
+	__slots__ = ("name", "function", "args", "key", "enqueued_at")
+
+	def __init__(self, name, function, args, key=None):
+		self.name = name
+		self.function = function
+		self.args = args
+		self.key = key
+		self.enqueued_at = time.perf_counter()
+
+
+class ActionDispatcher:
+	def __init__(self, backend=None, maxsize=32, min_interval=0.05, capacity=512):
+		self.backend = backend
+		self.maxsize = maxsize
+		self.min_interval = min_interval
+
+		self.queue = collections.deque()
+		self.pending_keys = set()
+		self.last_run = {}
+		self.condition = threading.Condition()
+		self.stats = Telemetry(enabled=True, capacity=capacity)
+
+		self.submitted = 0
+		self.coalesced = 0
+		self.dropped = 0
+		self.failed = 0
+		self.running = False
+		self.thread = None
+
+	def start(self):
+		# Starting twice is harmless, so callers can start whatever dispatcher they were handed.
+		if self.thread is not None and self.thread.is_alive():
+			return self
+
+		# The real backend is created on first use, so importing this module never pulls in pyautogui.
+		if self.backend is None:
+			self.backend = PyAutoGuiBackend()
+
+		self.running = True
+		self.thread = threading.Thread(target=self.loop, daemon=True)
+		self.thread.start()
+		return self
+
+	def submit(self, action):
+		with self.condition:
+			self.submitted += 1
+
+			# An action whose key is already waiting adds nothing, so repeats collapse into the queued one.
+			if action.key is not None and action.key in self.pending_keys:
+				self.coalesced += 1
+				return False
+
+			if len(self.queue) >= self.maxsize:
+				oldest = self.queue.popleft()
+				self.pending_keys.discard(oldest.key)
+				self.dropped += 1
+
+			self.queue.append(action)
+			if action.key is not None:
+				self.pending_keys.add(action.key)
+			self.condition.notify()
+		return True
+
+	def press(self, key, coalesce=True):
+		return self.submit(Action("press", lambda: self.backend.press(key), (), ("press", key) if coalesce else None))
+
+	def hotkey(self, *keys, coalesce=True):
+		return self.submit(Action("hotkey", lambda: self.backend.hotkey(*keys), (), ("hotkey",) + keys if coalesce else None))
+
+	def call(self, function, *args, key=None, name=None):
+		return self.submit(Action(name or getattr(function, "__name__", "call"), function, args, key))
+
+	def loop(self):
+		while True:
+			with self.condition:
+				while self.running and not self.queue:
+					self.condition.wait()
+				if not self.running and not self.queue:
+					return
+
+				action = self.queue.popleft()
+				self.pending_keys.discard(action.key)
+
+			# Rate limiting sleeps on this worker only; the frame loop keeps submitting in the meantime.
+			rate_key = action.key or action.name
+			last = self.last_run.get(rate_key)
+			if last is not None:
+				delay = last + self.min_interval - time.perf_counter()
+				if delay > 0:
+					time.sleep(delay)
+
+			start = time.perf_counter()
+			self.stats.record("wait", (start - action.enqueued_at) * 1000)
+			try:
+				action.function(*action.args)
+			except Exception as e:
+				self.failed += 1
+				print(f"Error in action {action.name}: {e}")
+
+			end = time.perf_counter()
+			self.stats.record("exec", (end - start) * 1000)
+			self.last_run[rate_key] = end
+
+	def summary(self):
+		return {
+			"submitted": self.submitted, "coalesced": self.coalesced, "dropped": self.dropped, "failed": self.failed,
+			**self.stats.summary(),
+		}
+
+	def stop(self, timeout=1.0):
+		with self.condition:
+			self.running = False
+			self.condition.notify()
+		if self.thread is not None:
+			self.thread.join(timeout=timeout)
@@ -0,0 +1,195 @@
+import collections
+import socket
+import threading
+import time
+import numpy as np
+import common_path  # puts ../common on sys.path
+from telemetry import Telemetry
+
+
+class LoopbackTransport:
+	def __init__(self, capacity=1024):
+		self.messages = collections.deque(maxlen=capacity)
+
+	def send(self, data):
+		self.messages.append((time.perf_counter(), data))
+		return True
+
+	def close(self):
+		pass
+
+
+class UdpTransport:
+	def __init__(self, host="127.0.0.1", port=9000):
+		self.address = (host, port)
+		self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		self.socket.setblocking(False)
+
+	def send(self, data):
+		try:
+			self.socket.sendto(data, self.address)
+			return True
+		except (BlockingIOError, OSError):
+			return False
+
+	def close(self):
+		self.socket.close()
+
+
+class SerialTransport:
+	def __init__(self, port, baudrate=115200):
+		import serial
+
+		# A zero write timeout makes writes non-blocking and returns how many bytes the OS buffer took, so a
+		# full buffer never stalls the sender; with a non-zero timeout pyserial raises and that count is lost.
+		self.serial = serial.Serial(port, baudrate, write_timeout=0)
+		self.timeout_error = serial.SerialTimeoutException
+		self.remainder = b""
+
+	def write(self, data):
+		try:
+			written = self.serial.write(data) or 0
+		except self.timeout_error:
+			written = 0
+		return data[written:]
+
+	def send(self, data):
+		# A frame cut short by a full buffer is finished before anything new goes out, since a truncated line
+		# would splice into the next command. New frames are dropped until it drains; the next tick resends.
+		if self.remainder:
+			self.remainder = self.write(self.remainder)
+			if self.remainder:
+				return False
+
+		self.remainder = self.write(data)
+		return not self.remainder
+
+	def close(self):
+		self.serial.close()
+
+
+def open_transport(spec="loopback"):
+	kind, _, target = str(spec).partition(":")
+	if kind == "udp":
+		host, _, port = target.rpartition(":")
+		return UdpTransport(host or "127.0.0.1", int(port or 9000))
+	if kind == "serial":
+		port, _, baudrate = target.partition("@")
+		return SerialTransport(port, int(baudrate or 115200))
+	return LoopbackTransport()
+
+
+def encode_command(name, values):
+	return (name + " " + " ".join(f"{value:.3f}" for value in values) + "\n").encode()
+
+
+class ControlChannel:
+	__slots__ = ("name", "target", "output", "deadzone", "max_rate", "low", "high", "timeout", "updated_at")
+
+	def __init__(self, name, size, deadzone=0.0, max_rate=None, low=-1.0, high=1.0, timeout=None):
+		self.name = name
+		self.target = np.zeros(size, dtype=np.float32)
+		self.output = np.zeros(size, dtype=np.float32)
+		self.deadzone = deadzone
+		self.max_rate = max_rate
+		self.low = low
+		self.high = high
+		self.timeout = timeout
+		self.updated_at = None
+
+	def step(self, now, dt):
+		target = self.target
+		if self.timeout is not None and (self.updated_at is None or now - self.updated_at > self.timeout):
+			target = np.zeros_like(target)
+
+		# The deadzone is radial, like the circle drawn around the gimbal center, and the output ramps from its edge.
+		if self.deadzone:
+			norm = float(np.linalg.norm(target))
+			target = target * ((norm - self.deadzone) / norm) if norm > self.deadzone else np.zeros_like(target)
+
+		target = np.clip(target, self.low, self.high)
+		if self.max_rate is not None:
+			max_step = self.max_rate * dt
+			target = self.output + np.clip(target - self.output, -max_step, max_step)
+
+		self.output[...] = target
+		return self.output
+
+
+class ControlOutput:
+	def __init__(self, transport=None, rate=100.0, encode=encode_command, capacity=1024):
+		self.transport = transport or LoopbackTransport()
+		self.rate = rate
+		self.interval = 1.0 / rate
+		self.encode = encode
+		self.channels = {}
+		self.stats = Telemetry(enabled=True, capacity=capacity)
+
+		self.ticks = 0
+		self.sent = 0
+		self.dropped = 0
+		self.missed = 0
+		self.stop_event = threading.Event()
+		self.thread = None
+
+	def add_channel(self, name, size, **kwargs):
+		channel = self.channels[name] = ControlChannel(name, size, **kwargs)
+		return channel
+
+	def set(self, name, values):
+		# Called from the vision loop: it only overwrites the latest target and never waits on the sender.
+		# Swapping in a new array is atomic, so the sender thread never sees a half-written target.
+		channel = self.channels[name]
+		channel.target = np.asarray(values, dtype=np.float32)
+		channel.updated_at = time.perf_counter()
+
+	def start(self):
+		self.thread = threading.Thread(target=self.loop, daemon=True)
+		self.thread.start()
+		return self
+
+	def loop(self):
+		start = time.perf_counter()
+		deadline = start
+		last = start
+
+		while not self.stop_event.is_set():
+			delay = deadline - time.perf_counter()
+			if delay > 0:
+				time.sleep(delay)
+
+			now = time.perf_counter()
+			self.stats.record("jitter", (now - deadline) * 1000)
+			self.tick(now, now - last)
+			last = now
+
+			# Schedule against the ideal timeline; if the sender fell a whole period behind, skip ahead rather than burst.
+			deadline += self.interval
+			if now - deadline > self.interval:
+				skipped = int((now - deadline) / self.interval)
+				self.missed += skipped
+				deadline += skipped * self.interval
+
+	def tick(self, now, dt):
+		self.ticks += 1
+		for channel in self.channels.values():
+			values = channel.step(now, dt)
+			with self.stats.stage("send"):
+				ok = self.transport.send(self.encode(channel.name, values))
+
+			if ok:
+				self.sent += 1
+			else:
+				self.dropped += 1
+
+			if channel.updated_at is not None:
+				self.stats.record("latency", (now - channel.updated_at) * 1000)
+
+	def summary(self):
+		return {"ticks": self.ticks, "sent": self.sent, "dropped": self.dropped, "missed": self.missed, **self.stats.summary()}
+
+	def stop(self):
+		self.stop_event.set()
+		if self.thread is not None:
+			self.thread.join(timeout=1.0)
+		self.transport.close()
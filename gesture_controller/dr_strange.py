@@ -1,18 +1,28 @@
 import cv2
 import math
-import numpy as np
-import pyautogui
+import sys
+import common_path  # puts ../common on sys.path
 from gestures import GestureRecognizer
+from frame_sources import parse_cli
+from telemetry import parse_telemetry
+from events import EdgeTrigger
+from actions import ActionDispatcher
 
 class ObjectController(GestureRecognizer):
-	def __init__(self, use_gestures=True):
-		super().__init__(use_gestures)
+	def __init__(self, use_gestures=True, actions=None, **kwargs):
+		super().__init__(use_gestures, **kwargs)
+		# Key presses run on the dispatcher's worker, so pyautogui's pause never holds up capture or inference.
+		# An injected dispatcher is started here too; an unstarted one would queue actions that never run.
+		self.actions = (actions or ActionDispatcher()).start()
 		self.object_scale = 1.0
 		self.object_rotation = 0.0
 		self.object_position = (0, 0)
 		self.previous_distance = None
 		self.previous_angle = None
-		self.key_pressed = False
+		# Activates at 3x scale and releases below 2.75x, so hovering at the threshold does not repeat the key press.
+		self.activation = EdgeTrigger(on=3, off=2.75)
+		self.current_mode = "?"
+		self.current_color = (255, 0, 30)
 
 	def calculate_distance(self, point1, point2):
 		x1, y1 = point1
@@ -71,10 +81,7 @@ class ObjectController(GestureRecognizer):
 		
 		return left_hand_landmarks and right_hand_landmarks
 
-	def draw_object(self, frame, hands_present):
-		x, y = self.object_position
-		size = int(50 * self.object_scale)
-		rad_angle = math.radians(self.object_rotation)
+	def update_mode(self, hands_present):
 		current_mode = "?"
 
 		current_color = (255, 0, 30)
@@ -87,15 +94,22 @@ class ObjectController(GestureRecognizer):
 				current_color = (0, 255, 0)
 				current_mode = "Conex"
 			
-			if self.object_scale >= 3:
+			if self.activation.update(self.object_scale):
+				self.actions.press("right")
+
+			if self.activation.active:
 				current_mode += " ACTIVE"
 				current_color = (255, 255, 255)
 
-				if not self.key_pressed:
-					self.key_pressed = True
-					pyautogui.press("right")
-			else:
-				self.key_pressed = False
+		self.current_mode = current_mode
+		self.current_color = current_color
+
+	def draw_object(self, frame):
+		x, y = self.object_position
+		size = int(50 * self.object_scale)
+		rad_angle = math.radians(self.object_rotation)
+		current_mode = self.current_mode
+		current_color = self.current_color
 
 		corners = [
 			(-size, -size), 
@@ -112,39 +126,60 @@ class ObjectController(GestureRecognizer):
 			for cx, cy in corners
 		]
 
-		text_size = cv2.getTextSize(current_mode, cv2.FONT_HERSHEY_COMPLEX, 1, 3)[0]
-		text_width = text_size[0]
-		text_x = x - text_width // 2 
+		# The mode label only ever takes a handful of values, so it is rasterized once and blitted from the cache.
+		self.hud.polyline(rotated_corners, current_color, 4)
+		self.hud.text(current_mode, (x, y), cv2.FONT_HERSHEY_COMPLEX, 1, (255, 255, 255), 2, anchor="center")
+		self.hud.flush(frame)
 
-		cv2.putText(frame, current_mode, (text_x, y), cv2.FONT_HERSHEY_COMPLEX, 1, (255, 255, 255), 2)
-
-		cv2.polylines(frame, [np.array(rotated_corners)], isClosed=True, color=current_color, thickness=4)
+	def cleanup(self):
+		self.actions.stop()
+		super().cleanup()
 
 	def run(self, frame: cv2.typing.MatLike, draw_gestures: bool = True):
 		frame, data = super().run(frame, draw_gestures)
-		
-		hands_present = self.update_object_controls()
-		self.draw_object(frame, hands_present)
+
+		with self.telemetry.stage("controller"):
+			hands_present = self.update_object_controls()
+			self.update_mode(hands_present)
+
+		if not self.headless:
+			with self.telemetry.stage("draw"):
+				self.draw_object(frame)
 
 		return frame
 
 if __name__ == "__main__":
 	try:
-		controller = ObjectController(use_gestures=False)
+		source, headless = parse_cli(sys.argv)
+		telemetry = parse_telemetry(sys.argv)
+		# Headless runs skip the flip and let the recognizer mirror the landmarks instead.
+		controller = ObjectController(use_gestures=False, source=source, telemetry=telemetry, headless=headless, mirror=headless)
 
 		while True:
-			ret, frame = controller.cap.read()
-			frame = cv2.flip(frame, 1)
+			ret, frame = controller.read_latest()
 
 			if not ret:
 				print("Error: Could not read frame.")
 				break
+			if not controller.fresh:
+				continue
+
+			if not headless:
+				frame = cv2.flip(frame, 1)
 
 			frame = controller.run(frame)
+			telemetry.frame_done()
+
+			if headless:
+				continue
+
+			telemetry.draw(frame)
 
-			cv2.imshow("Object Controller", frame)
+			with telemetry.stage("display"):
+				cv2.imshow("Object Controller", frame)
+				key = cv2.waitKey(1) & 0xFF
 
-			if cv2.waitKey(1) & 0xFF == ord('q'):
+			if key == ord('q'):
 				break
 
 		controller.cleanup()
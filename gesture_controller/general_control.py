@@ -1,21 +1,29 @@
 import cv2
 import math
+import sys
+import common_path  # puts ../common on sys.path
 from gestures import GestureRecognizer
+from frame_sources import CameraSource, parse_cli
+from telemetry import parse_telemetry
+from events import GestureEventBus, GESTURE_STARTED, PINCH
+from control_output import ControlOutput, open_transport
 from enum import Enum
 
 cv2.setUseOptimized(True)
 
-gesture = GestureRecognizer()
-
 window_name = "Gesture Control"
-cap = cv2.VideoCapture(0)
 
 window_width = 1280
 window_height = 720
 
-cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc("M", "J", "P", "G"))
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, window_width)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, window_height)
+source, headless = parse_cli(sys.argv, width=window_width, height=window_height)
+if source is None:
+    source = CameraSource(0, window_width, window_height, fourcc="MJPG")
+
+telemetry = parse_telemetry(sys.argv)
+events = GestureEventBus()
+# Headless runs skip the flip below and have the recognizer mirror the landmarks instead.
+gesture = GestureRecognizer(use_gestures=True, source=source, telemetry=telemetry, headless=headless, mirror=headless, events=events)
 
 ControlMode = Enum("ControlMode", ["INACTIVE", "SERVO", "GIMBAL"])
 
@@ -30,52 +38,82 @@ gimbal_pos_set = False
 deadzone = 48
 mode = ControlMode.INACTIVE
 laser_on = False
-has_activated = False
 
 max_servos = 4
 frame_count = 0
 
+# Commands go out at a steady 100 Hz on their own thread, independent of the camera and display rate.
+# Pass --control=udp:host:port or --control=serial:COM4@115200; the default loopback just records them.
+control_spec = next((arg.partition("=")[2] for arg in sys.argv if arg.startswith("--control=")), "loopback")
+control = ControlOutput(open_transport(control_spec), rate=100.0)
+gimbal_range = window_height / 2
+control.add_channel("gimbal", 2, deadzone=deadzone / gimbal_range, max_rate=4.0, timeout=0.25)
+control.add_channel("servo", max_servos, low=0, high=window_height, max_rate=2000.0)
+control.start()
+
+mode_gestures = {
+    "ILoveYou": ControlMode.SERVO,
+    "Victory": ControlMode.GIMBAL,
+    "Pointing_Up": ControlMode.INACTIVE,
+}
+
+def on_mode_gesture(event):
+    global mode
+    mode = mode_gestures.get(event.name, mode)
+
+def on_laser_pinch(event):
+    global laser_on
+    if mode == ControlMode.GIMBAL:
+        laser_on = not laser_on
+
+# The frame is mirrored, so the user's left hand is reported as "Right".
+events.on(GESTURE_STARTED, on_mode_gesture, hand="Right")
+events.add_pinch("laser", "Right", 4, 5, on=30)
+events.on(PINCH, on_laser_pinch, name="laser")
+
+# Static labels and guides are queued on the recognizer's HUD and drawn in one pass per frame.
+hud = gesture.hud
+
 while True:
-    ret, frame = cap.read()
+    ret, frame = gesture.read_latest()
     if not ret:
         print("Error: Could not read frame.")
         break
+    if not gesture.fresh:
+        continue
 
-    frame = cv2.flip(frame, 1)
-
-    frame, hand_gesture = gesture.loop_run(frame, False)
+    if not headless:
+        frame = cv2.flip(frame, 1)
 
-    left_hand = hand_gesture["Right"]
-    right_hand = hand_gesture["Left"]
-
-    if left_hand == "ILoveYou":
-        mode = ControlMode.SERVO
-    elif left_hand == "Victory":
-        mode = ControlMode.GIMBAL
-    elif left_hand == "Pointing_Up":
-        mode = ControlMode.INACTIVE
+    # Mode changes and the laser toggle are handled by the event bus during run().
+    frame, hand_data = gesture.run(frame, False)
+    telemetry.lap()
 
     if mode == ControlMode.INACTIVE:
         gimbal_pos_set = False
+        control.set("gimbal", (0, 0))
 
     elif mode == ControlMode.SERVO:
         gimbal_pos_set = False
+        control.set("gimbal", (0, 0))
         
+        servo_lengths = []
         for i in range(max_servos):
             servo_length, is_active = gesture.length_between_landmarks(frame, 0, (i * 4) + 8)
+            servo_lengths.append(servo_length)
             active_text = "ON" if is_active else "OFF"
 
-            cv2.putText(frame, f"Servo {i}: {servo_length}, {active_text}", (10, (i * 30) + 80), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2, cv2.LINE_AA)
+            if not headless:
+                cv2.putText(frame, f"Servo {i}: {servo_length}, {active_text}", (10, (i * 30) + 80), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2, cv2.LINE_AA)
         
-        gesture.length_between_landmarks(frame, 4, 5, "Right", False, 30)
+        control.set("servo", servo_lengths)
         
     elif mode == ControlMode.GIMBAL:
         landmark_1, landmark_2, landmark_3 = 8, 5, 17
         
-        if gesture.landmark_list and gesture.check_landmark_handedness([landmark_1], "Right"):
-            x1, y1 = gesture.landmark_list[landmark_1][1], gesture.landmark_list[landmark_1][2]
-
-            cv2.circle(frame, (x1, y1), 8, (255, 0, 0), cv2.FILLED)
+        landmark_list = gesture.landmark_list("Right")
+        if landmark_list and gesture.check_landmark_handedness([landmark_1], "Right"):
+            x1, y1 = landmark_list[landmark_1][1], landmark_list[landmark_1][2]
 
             if not gimbal_pos_set and x1 > window_width // 2:
                 gimbal_pos_set = True
@@ -83,30 +121,45 @@ while True:
                 center_x = x1
                 center_y = y1
 
-            cv2.circle(frame, (center_x, center_y), deadzone, (255, 0, 255), 4)
+            if gimbal_pos_set:
+                control.set("gimbal", ((x1 - center_x) / gimbal_range, (y1 - center_y) / gimbal_range))
+
+            if not headless and gimbal_pos_set:
+                hud.circle((x1, y1), 8, (255, 0, 0))
+                hud.circle((center_x, center_y), deadzone, (255, 0, 255), 4)
+
+                hud.line((center_x, center_y), (x1, y1), (0, 0, 255), 4)
+                hud.line((center_x, center_y), (x1, center_y), (0, 255, 255), 4)
+                hud.line((x1, center_y), (x1, y1), (0, 255, 0), 4)
+
+            if not headless:
+                gesture.length_between_landmarks(frame, 4, 5, "Right", True, 30)
 
-            cv2.line(frame, (center_x, center_y), (x1, y1), (0, 0, 255), 4)
-            cv2.line(frame, (center_x, center_y), (x1, center_y), (0, 255, 255), 4)
-            cv2.line(frame, (x1, center_y), (x1, y1), (0, 255, 0), 4)
+        if not headless:
+            hud.text(f"Laser: {laser_on}", (10, 80), scale=0.75, color=(0, 0, 255), thickness=2)
 
-            _, laser_active = gesture.length_between_landmarks(frame, 4, 5, "Right", True, 30)
+    telemetry.lap("controller")
 
-            if laser_active:
-                if not has_activated:
-                    has_activated = True
-                    laser_on = not laser_on
-            else:
-                has_activated = False
+    if headless:
+        telemetry.frame_done()
+        frame_count += 1
+        continue
 
-        cv2.putText(frame, f"Laser: {laser_on}", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2, cv2.LINE_AA)
+    with telemetry.stage("draw"):
+        hud.text(f"Mode: {ControlNames[mode]}", (10, 50), scale=1, color=(0, 0, 255), thickness=2)
+        hud.flush(frame)
+        telemetry.draw(frame, (10, window_height - 200))
 
-    cv2.putText(frame, f"Mode: {ControlNames[mode]}", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2, cv2.LINE_AA)
-    cv2.imshow(window_name, frame)
+    with telemetry.stage("display"):
+        cv2.imshow(window_name, frame)
+        key = cv2.waitKey(1) & 0xFF
+    telemetry.frame_done()
 
-    if cv2.waitKey(1) & 0xFF == ord("q"):
+    if key == ord("q"):
         break
 
     frame_count += 1
 
-cap.release()
-cv2.destroyAllWindows()
+control.stop()
+print(f"Control output: {control.summary()}")
+gesture.cleanup()
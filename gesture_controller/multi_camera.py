@@ -0,0 +1,216 @@
+import multiprocessing as mp_proc
+import time
+import cv2
+import numpy as np
+from multiprocessing import shared_memory
+import common_path  # puts ../common on sys.path
+
+
+GESTURE_NAMES = ["None", "Closed_Fist", "Open_Palm", "Pointing_Up", "Thumb_Down", "Thumb_Up", "Victory", "ILoveYou"]
+HAND_LABELS = ("Left", "Right")
+
+# Per-slot metadata: sequence number, wall-clock timestamp, frame index, and per hand (present, gesture code).
+META_FIELDS = 3 + 2 * len(HAND_LABELS)
+
+
+class CameraRing:
+	def __init__(self, slots, frame_shape, names=None):
+		self.slots = slots
+		self.frame_shape = tuple(frame_shape)
+		self.owner = names is None
+
+		shapes = {
+			"frames": ((slots,) + self.frame_shape, np.uint8),
+			"landmarks": ((slots, len(HAND_LABELS), 21, 3), np.float32),
+			"meta": ((slots, META_FIELDS), np.float64),
+		}
+
+		self.memory = {}
+		self.arrays = {}
+		for key, (shape, dtype) in shapes.items():
+			size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+			if self.owner:
+				memory = shared_memory.SharedMemory(create=True, size=size)
+			else:
+				memory = shared_memory.SharedMemory(name=names[key])
+			self.memory[key] = memory
+			self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+		if self.owner:
+			self.arrays["meta"][:, 0] = -1
+
+	def names(self):
+		return {key: memory.name for key, memory in self.memory.items()}
+
+	def write(self, seq, frame, hand_state, frame_index):
+		slot = seq % self.slots
+		meta = self.arrays["meta"][slot]
+
+		# Readers treat a slot whose sequence number changes during their copy as torn and skip it.
+		meta[0] = -1
+		target = self.arrays["frames"][slot]
+		if frame.shape == self.frame_shape:
+			target[...] = frame
+		else:
+			cv2.resize(frame, (self.frame_shape[1], self.frame_shape[0]), dst=target)
+
+		self.arrays["landmarks"][slot] = hand_state.landmarks
+		meta[1] = time.time()
+		meta[2] = frame_index
+		for i, hand in enumerate(hand_state.meta):
+			meta[3 + i * 2] = hand.present
+			meta[4 + i * 2] = GESTURE_NAMES.index(hand.gesture) if hand.gesture in GESTURE_NAMES else 0
+		meta[0] = seq
+
+	def read(self, seq, with_frame=False):
+		slot = seq % self.slots
+		meta = self.arrays["meta"][slot].copy()
+		if meta[0] != seq:
+			return None
+
+		landmarks = self.arrays["landmarks"][slot].copy()
+		frame = self.arrays["frames"][slot].copy() if with_frame else None
+		if self.arrays["meta"][slot, 0] != seq:
+			return None
+		return meta, landmarks, frame
+
+	def close(self):
+		self.arrays.clear()
+		for memory in self.memory.values():
+			memory.close()
+			if self.owner:
+				memory.unlink()
+
+
+class CameraResult:
+	__slots__ = ("camera_id", "seq", "timestamp", "frame_index", "landmarks", "present", "gestures", "frame")
+
+	def __init__(self, camera_id, seq, meta, landmarks, frame=None):
+		self.camera_id = camera_id
+		self.seq = seq
+		self.timestamp = meta[1]
+		self.frame_index = int(meta[2])
+		self.landmarks = landmarks
+		self.present = [bool(meta[3 + i * 2]) for i in range(len(HAND_LABELS))]
+		self.gestures = [GESTURE_NAMES[int(meta[4 + i * 2])] for i in range(len(HAND_LABELS))]
+		self.frame = frame
+
+	@property
+	def hand_data(self):
+		hand_data = {}
+		for i, label in enumerate(HAND_LABELS):
+			landmarks = []
+			if self.present[i]:
+				points = self.landmarks[i, :, :2].astype(np.int32).tolist()
+				landmarks = [[id, x, y, label] for id, (x, y) in enumerate(points)]
+			hand_data[label] = {"landmarks": landmarks, "gesture": self.gestures[i], "gesture_frame": self.frame_index}
+		return hand_data
+
+
+def camera_worker(camera_index, names, slots, frame_shape, head, stop_event, recognizer_kwargs):
+	from gestures import GestureRecognizer
+
+	ring = CameraRing(slots, frame_shape, names)
+	recognizer = GestureRecognizer(camera_index=camera_index, **recognizer_kwargs)
+
+	try:
+		seq = 0
+		while not stop_event.is_set():
+			ret, frame = recognizer.read_latest()
+			if not ret:
+				print(f"Error: Could not read frame from camera {camera_index}.")
+				break
+			if not recognizer.fresh:
+				continue
+
+			recognizer.run(frame, False)
+			ring.write(seq, frame, recognizer.hand_state, recognizer.frame_index)
+			head.value = seq
+			seq += 1
+	except Exception as e:
+		print(f"Error in camera worker {camera_index}: {e}")
+	finally:
+		recognizer.cleanup()
+		ring.close()
+
+
+class CameraSupervisor:
+	def __init__(self, camera_indices, frame_shape=(960, 1280, 3), slots=4, **recognizer_kwargs):
+		self.camera_indices = list(camera_indices)
+		self.frame_shape = frame_shape
+		self.slots = slots
+		self.recognizer_kwargs = recognizer_kwargs
+
+		self.context = mp_proc.get_context("spawn")
+		self.stop_event = self.context.Event()
+		self.rings = []
+		self.heads = []
+		self.last_read = []
+		self.processes = []
+
+	def start(self):
+		for camera_index in self.camera_indices:
+			ring = CameraRing(self.slots, self.frame_shape)
+			head = self.context.Value("q", -1, lock=False)
+			process = self.context.Process(
+				target=camera_worker,
+				args=(camera_index, ring.names(), self.slots, self.frame_shape, head, self.stop_event, self.recognizer_kwargs),
+				daemon=True,
+			)
+			process.start()
+
+			self.rings.append(ring)
+			self.heads.append(head)
+			self.last_read.append(-1)
+			self.processes.append(process)
+		return self
+
+	def poll(self, with_frames=False):
+		results = []
+		for camera_id, (ring, head) in enumerate(zip(self.rings, self.heads)):
+			latest = head.value
+			if latest <= self.last_read[camera_id]:
+				continue
+
+			# A slow controller skips straight to the newest slots instead of replaying the whole backlog.
+			start = max(self.last_read[camera_id] + 1, latest - self.slots + 1)
+			for seq in range(start, latest + 1):
+				data = ring.read(seq, with_frames)
+				if data is not None:
+					results.append(CameraResult(camera_id, seq, *data))
+			self.last_read[camera_id] = latest
+
+		results.sort(key=lambda result: result.timestamp)
+		return results
+
+	def stream(self, with_frames=False, idle_sleep=0.002):
+		while not self.stop_event.is_set():
+			results = self.poll(with_frames)
+			if not results:
+				if not any(process.is_alive() for process in self.processes):
+					return
+				time.sleep(idle_sleep)
+				continue
+			yield from results
+
+	def stop(self):
+		self.stop_event.set()
+		for process in self.processes:
+			process.join(timeout=5.0)
+			if process.is_alive():
+				process.terminate()
+		for ring in self.rings:
+			ring.close()
+		self.rings.clear()
+
+
+if __name__ == "__main__":
+	supervisor = CameraSupervisor([0, 1]).start()
+	try:
+		for result in supervisor.stream():
+			hand_data = result.hand_data
+			print(f"camera {result.camera_id} frame {result.frame_index}: {hand_data['Left']['gesture']} / {hand_data['Right']['gesture']}")
+	except KeyboardInterrupt:
+		pass
+	finally:
+		supervisor.stop()
@@ -0,0 +1,88 @@
+import threading
+import time
+import pytest
+from actions import ActionDispatcher, RecordingBackend
+
+
+@pytest.fixture
+def dispatcher():
+	dispatcher = ActionDispatcher(RecordingBackend(), min_interval=0.0).start()
+	yield dispatcher
+	dispatcher.stop()
+
+
+def hold(dispatcher):
+	# Parks the worker inside an action, so everything submitted next is still queued when the test inspects it.
+	started, release = threading.Event(), threading.Event()
+	dispatcher.call(lambda: (started.set(), release.wait(1.0)), name="hold")
+	assert started.wait(1.0)
+	return release
+
+
+def pressed(dispatcher):
+	return [args for _, _, args in dispatcher.backend.calls]
+
+
+def test_repeated_presses_coalesce_while_pending(dispatcher):
+	release = hold(dispatcher)
+	for _ in range(5):
+		dispatcher.press("right")
+	dispatcher.press("left")
+	release.set()
+	dispatcher.stop()
+
+	assert pressed(dispatcher) == [("right",), ("left",)]
+	assert dispatcher.summary()["coalesced"] == 4
+
+
+def test_uncoalesced_presses_all_run(dispatcher):
+	release = hold(dispatcher)
+	for _ in range(3):
+		dispatcher.press("right", coalesce=False)
+	release.set()
+	dispatcher.stop()
+
+	assert pressed(dispatcher) == [("right",)] * 3
+
+
+def test_full_queue_drops_oldest(dispatcher):
+	dispatcher.maxsize = 2
+	release = hold(dispatcher)
+	for key in ("a", "b", "c"):
+		dispatcher.press(key)
+	release.set()
+	dispatcher.stop()
+
+	assert pressed(dispatcher) == [("b",), ("c",)]
+	assert dispatcher.summary()["dropped"] == 1
+
+
+def test_same_key_is_rate_limited(dispatcher):
+	dispatcher.min_interval = 0.05
+	release = hold(dispatcher)
+	dispatcher.press("right", coalesce=False)
+	dispatcher.press("right", coalesce=False)
+	release.set()
+	dispatcher.stop()
+
+	first, second = (timestamp for timestamp, _, _ in dispatcher.backend.calls)
+	assert second - first >= 0.045
+
+
+def test_different_keys_are_not_rate_limited(dispatcher):
+	dispatcher.min_interval = 0.5
+	release = hold(dispatcher)
+	dispatcher.press("left")
+	dispatcher.press("right")
+	start = time.perf_counter()
+	release.set()
+	dispatcher.stop()
+
+	assert pressed(dispatcher) == [("left",), ("right",)]
+	assert time.perf_counter() - start < 0.25
+
+
+def test_start_is_idempotent(dispatcher):
+	thread = dispatcher.thread
+
+	assert dispatcher.start().thread is thread
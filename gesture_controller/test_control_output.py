@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import serial
+from control_output import ControlChannel, SerialTransport, encode_command
+
+
+class ShortWriteSerial:
+	# Stands in for serial.Serial: each write accepts at most the next budgeted number of bytes.
+	def __init__(self, *args, **kwargs):
+		self.budgets = []
+		self.written = b""
+
+	def write(self, data):
+		accepted = data[:self.budgets.pop(0)] if self.budgets else data
+		self.written += accepted
+		return len(accepted)
+
+	def close(self):
+		pass
+
+
+@pytest.fixture
+def transport(monkeypatch):
+	monkeypatch.setattr(serial, "Serial", ShortWriteSerial)
+	transport = SerialTransport("loop")
+	yield transport
+	transport.close()
+
+
+def test_channel_deadzone_is_radial_and_ramps_from_its_edge():
+	channel = ControlChannel("gimbal", 2, deadzone=0.2)
+
+	channel.target = np.float32([0.1, 0.1])
+	assert np.allclose(channel.step(0.0, 0.01), [0.0, 0.0])
+
+	channel.target = np.float32([0.6, 0.0])
+	assert np.allclose(channel.step(0.0, 0.01), [0.4, 0.0])
+
+
+def test_channel_clips_to_its_range():
+	channel = ControlChannel("servo", 2, low=0.0, high=1.0)
+	channel.target = np.float32([-3.0, 3.0])
+
+	assert np.allclose(channel.step(0.0, 0.01), [0.0, 1.0])
+
+
+def test_channel_rate_limit_caps_each_step():
+	channel = ControlChannel("gimbal", 1, max_rate=2.0)
+	channel.target = np.float32([1.0])
+
+	assert np.allclose(channel.step(0.0, 0.1), [0.2])
+	assert np.allclose(channel.step(0.1, 0.1), [0.4])
+
+
+def test_channel_times_out_to_zero():
+	channel = ControlChannel("gimbal", 1, timeout=0.5)
+	channel.target = np.float32([0.5])
+	channel.updated_at = 0.0
+
+	assert np.allclose(channel.step(0.4, 0.01), [0.5])
+	assert np.allclose(channel.step(0.6, 0.01), [0.0])
+
+
+def test_serial_transport_finishes_a_partial_frame_before_the_next(transport):
+	first, second, third = encode_command("a", [1.0]), encode_command("b", [2.0]), encode_command("c", [3.0])
+	transport.serial.budgets = [3, 0, 100]
+
+	assert not transport.send(first)
+	assert not transport.send(second)
+	assert transport.send(third)
+	assert transport.serial.written == first + third
+
+
+def test_serial_transport_sends_whole_frames_when_there_is_room(transport):
+	frames = [encode_command("gimbal", [0.5, -0.5]) for _ in range(3)]
+
+	assert all(transport.send(frame) for frame in frames)
+	assert transport.serial.written == b"".join(frames)
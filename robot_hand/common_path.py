@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Capture, telemetry, the HUD and the gesture recognizer are shared by every project and live in ../common.
+COMMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common")
+if COMMON_DIR not in sys.path:
+	sys.path.insert(0, COMMON_DIR)
@@ -1,6 +1,52 @@
 #include <Servo.h>
 
-Servo servos[5];
+// Frame layout (see servo_link.py): 0xA5 0x5A, type, sequence, payload length, payload, CRC-8 over type..payload.
+const byte SYNC_1 = 0xA5;
+const byte SYNC_2 = 0x5A;
+const byte MSG_ANGLES = 0x01;
+const byte MSG_ACK = 0x02;
+const byte ACK_REQUESTED = 0x80;
+const byte MAX_PAYLOAD = 32;
+const int NUM_SERVOS = 5;
+
+Servo servos[NUM_SERVOS];
+
+byte frame[3 + MAX_PAYLOAD];
+byte received = 0;
+byte state = 0;
+
+byte crc8(const byte *data, byte length) {
+  byte crc = 0;
+  for (byte i = 0; i < length; i++) {
+    crc ^= data[i];
+    for (byte bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x80) ? (crc << 1) ^ 0x07 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+void sendAck(byte seq) {
+  byte body[3] = {MSG_ACK, seq, 0};
+  Serial.write(SYNC_1);
+  Serial.write(SYNC_2);
+  Serial.write(body, 3);
+  Serial.write(crc8(body, 3));
+}
+
+void handleFrame() {
+  byte type = frame[0];
+  byte length = frame[2];
+
+  if ((type & ~ACK_REQUESTED) == MSG_ANGLES) {
+    for (byte i = 0; i < length && i < NUM_SERVOS; i++) {
+      servos[i].write(frame[3 + i]);
+    }
+  }
+  if (type & ACK_REQUESTED) {
+    sendAck(frame[1]);
+  }
+}
 
 void setup() {
   servos[0].attach(6);
@@ -8,21 +54,31 @@ void setup() {
   servos[2].attach(4);
   servos[3].attach(3);
   servos[4].attach(2);
-  Serial.begin(9600);
+  Serial.begin(115200);
 }
 
 void loop() {
-  if (Serial.available() > 0) {
-    int angle1 = Serial.parseInt();
-    int angle2 = Serial.parseInt();
-    int angle3 = Serial.parseInt();
-    int angle4 = Serial.parseInt();
-    int angle5 = Serial.parseInt();
-    
-    servos[0].write(angle1);
-    servos[1].write(angle2);
-    servos[2].write(angle3);
-    servos[3].write(angle4);
-    servos[4].write(angle5);
+  while (Serial.available() > 0) {
+    byte value = Serial.read();
+
+    // States: 0 wait for SYNC_1, 1 wait for SYNC_2, 2 read header and payload, 3 read checksum.
+    if (state == 0) {
+      state = value == SYNC_1 ? 1 : 0;
+    } else if (state == 1) {
+      state = value == SYNC_2 ? 2 : (value == SYNC_1 ? 1 : 0);
+      received = 0;
+    } else if (state == 2) {
+      frame[received++] = value;
+      if (received == 3 && frame[2] > MAX_PAYLOAD) {
+        state = 0;
+      } else if (received >= 3 && received == 3 + frame[2]) {
+        state = 3;
+      }
+    } else {
+      if (value == crc8(frame, received)) {
+        handleFrame();
+      }
+      state = 0;
+    }
   }
 }
@@ -0,0 +1,96 @@
+import threading
+import time
+import numpy as np
+
+
+# Wrist to each fingertip, thumb first, matching the servo order on the hand.
+WRIST = 0
+FINGER_TIPS = (4, 8, 12, 16, 20)
+
+
+class FingerMapper:
+	def __init__(self, scale, flip, tips=FINGER_TIPS, origin=WRIST, max_angle=180.0):
+		scale = np.asarray(scale, dtype=np.float32)
+		self.low = scale[:, 0]
+		self.span = np.maximum(scale[:, 1] - scale[:, 0], 1.0)
+		self.flip = np.asarray(flip, dtype=bool)
+		self.tips = np.asarray(tips)
+		self.origin = origin
+		self.max_angle = max_angle
+		self.angles = np.zeros(len(self.tips), dtype=np.float32)
+
+	def map(self, hand_state, label):
+		if not hand_state.meta[hand_state.index[label]].present:
+			return None
+
+		# All five fingers in one step: a fancy-index into the per-frame distance cache, then one normalize and flip.
+		hand_state.update_geometry()
+		lengths = hand_state.distances[hand_state.index[label], self.origin, self.tips]
+		np.clip((lengths - self.low) / self.span, 0.0, 1.0, out=self.angles)
+		self.angles *= self.max_angle
+		self.angles[self.flip] = self.max_angle - self.angles[self.flip]
+		return self.angles
+
+
+class TrajectoryGenerator:
+	def __init__(self, output, count=5, rate=100.0, max_speed=360.0, min_segment=0.01, max_segment=0.2):
+		self.output = output
+		self.rate = rate
+		self.interval = 1.0 / rate
+		self.max_speed = max_speed
+		self.min_segment = min_segment
+		self.max_segment = max_segment
+
+		self.lock = threading.Lock()
+		self.current = None
+		self.start = np.zeros(count, dtype=np.float32)
+		self.target = np.zeros(count, dtype=np.float32)
+		self.segment_time = 0.0
+		self.segment_duration = max_segment
+		self.last_target_time = None
+
+		self.running = True
+		self.thread = threading.Thread(target=self.loop, daemon=True)
+		self.thread.start()
+
+	def set(self, angles):
+		now = time.perf_counter()
+		with self.lock:
+			if self.current is None:
+				self.current = np.array(angles, dtype=np.float32)
+
+			# Each new camera target starts a linear segment from where the output is now, stretched over the
+			# typical gap between targets, so the output ramps smoothly instead of stepping at the camera rate.
+			if self.last_target_time is not None:
+				gap = min(max(now - self.last_target_time, self.min_segment), self.max_segment)
+				self.segment_duration += 0.2 * (gap - self.segment_duration)
+			self.last_target_time = now
+
+			self.start[...] = self.current
+			self.target[...] = angles
+			self.segment_time = now
+
+	def loop(self):
+		deadline = time.perf_counter()
+		while self.running:
+			delay = deadline - time.perf_counter()
+			if delay > 0:
+				time.sleep(delay)
+			deadline = max(deadline + self.interval, time.perf_counter() - self.interval)
+
+			now = time.perf_counter()
+			with self.lock:
+				if self.current is None:
+					continue
+				progress = min(1.0, (now - self.segment_time) / self.segment_duration)
+				desired = self.start + (self.target - self.start) * progress
+
+				max_step = self.max_speed * self.interval
+				self.current += np.clip(desired - self.current, -max_step, max_step)
+				angles = self.current.copy()
+
+			self.output.set(angles)
+
+	def close(self):
+		self.running = False
+		self.thread.join(timeout=1.0)
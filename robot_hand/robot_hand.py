@@ -1,66 +1,75 @@
 import cv2
+import sys
 import threading
-import serial
-import time
+import common_path  # puts ../common on sys.path
 from gestures import GestureRecognizer
-
-arduino_serial = serial.Serial('COM3', 9600)
+from frame_sources import parse_cli
+from events import GestureEventBus, GESTURE_STARTED
+from servo_link import ServoLink, open_device
+from mimic import FingerMapper, TrajectoryGenerator
+
+# Pass --port=loopback to run against the in-process fake device instead of the Arduino.
+port = next((arg.partition("=")[2] for arg in sys.argv if arg.startswith("--port=")), "COM3")
+servo_link = ServoLink(open_device(port, 115200), acks="--acks" in sys.argv)
 depth = 1
 
 def open_palm():
-    global all_servo_lengths
-    all_servo_lengths = [0, 180, 0, 0, 180]
+    servo_link.set([0, 180, 0, 0, 180])
     print("OPEN PALM")
 
 def close_palm():
-    global all_servo_lengths
-    all_servo_lengths = [180, 0, 180, 180, 0]
+    servo_link.set([180, 0, 180, 180, 0])
     print("CLOSE PALM")
 
 def love_you():
-    global all_servo_lengths
-    all_servo_lengths = [0, 180, 180, 180, 180]
+    servo_link.set([0, 180, 180, 180, 180])
     print("LOVE YOU")
 
 def victory():
-    global all_servo_lengths
-    all_servo_lengths = [180, 180, 0, 180, 0]
+    servo_link.set([180, 180, 0, 180, 0])
     print("VICTORY")
 
 def point_up():
-    global all_servo_lengths
-    all_servo_lengths = [0, 180, 180, 0, 0]
+    servo_link.set([0, 180, 180, 0, 0])
     print("POINT UP")
 
-def send_servo_angles():
-    while True:
-        angles_str = ' '.join(map(str, all_servo_lengths)) + '\n'
-        arduino_serial.write(angles_str.encode())
-        time.sleep(0.1)
-        
 def capture_and_process():
     global depth
     while True:
-        ret, frame = gesture_recognizer.cap.read()
+        ret, frame = gesture_recognizer.read_latest()
         if not ret:
             print("Error: Could not read frame.")
             break
+        if not gesture_recognizer.fresh:
+            continue
 
+        # Gesture handlers fire from the event bus inside run(), once per gesture rather than once per frame.
         frame, hand_data = gesture_recognizer.run(frame)
 
-        left_gesture = hand_data["Left"]["gesture"]
-        right_gesture = hand_data["Right"]["gesture"]
+        if mimic:
+            hand = gesture_recognizer.resolve_hand(None)
+            angles = finger_mapper.map(gesture_recognizer.hand_state, hand) if hand else None
+            if angles is not None:
+                trajectory.set(angles)
 
-        for func_name, func in gesture_funcs.items():
-            if func_name == left_gesture or func_name == right_gesture:
-                func()
+        if headless:
+            continue
 
         cv2.imshow("Gesture Control", frame)
 
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
-gesture_recognizer = GestureRecognizer(use_gestures=True)
+def on_gesture(event):
+    func = gesture_funcs.get(event.name)
+    if func is not None:
+        func()
+
+source, headless = parse_cli(sys.argv)
+# --mimic copies the hand's finger positions continuously instead of switching between the fixed poses below.
+mimic = "--mimic" in sys.argv
+events = GestureEventBus()
+gesture_recognizer = GestureRecognizer(use_gestures=not mimic, source=source, headless=headless, events=events)
 
 gesture_funcs = {
     "Open_Palm": open_palm,
@@ -69,9 +78,10 @@ gesture_funcs = {
     "Victory": victory,
     "Pointing_Up": point_up
 }
+if not mimic:
+    events.on(GESTURE_STARTED, on_gesture)
 
 max_servos = 5
-all_servo_lengths = [0, 0, 0, 0, 0]
 flip_servo_lengths = [True, False, True, True, False]
 origin_servo_scale = [
     [100, 250],
@@ -81,16 +91,18 @@ origin_servo_scale = [
     [150, 325]
 ]
 
-servo_thread = threading.Thread(target=send_servo_angles)
-servo_thread.daemon = True
-servo_thread.start()
+# Each finger's wrist-to-tip distance is mapped through its calibration range; the trajectory generator then
+# streams interpolated, speed-limited angles at 100 Hz, independent of the camera frame rate.
+finger_mapper = FingerMapper(origin_servo_scale, flip_servo_lengths)
+trajectory = TrajectoryGenerator(servo_link, max_servos, rate=100.0) if mimic else None
 
 capture_thread = threading.Thread(target=capture_and_process)
 capture_thread.daemon = True
 capture_thread.start()
 
 capture_thread.join()
-servo_thread.join()
 
 gesture_recognizer.cleanup()
-arduino_serial.close()
+if trajectory is not None:
+    trajectory.close()
+servo_link.close()
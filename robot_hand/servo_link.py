@@ -0,0 +1,273 @@
+import collections
+import os
+import select
+import threading
+import time
+import common_path  # puts ../common on sys.path
+from telemetry import Telemetry
+
+
+# Frame layout: SYNC (2 bytes), type, sequence, payload length, payload, CRC-8 over type..payload.
+SYNC = b"\xA5\x5A"
+MSG_ANGLES = 0x01
+MSG_ACK = 0x02
+ACK_REQUESTED = 0x80
+HEADER_SIZE = len(SYNC) + 3
+MAX_PAYLOAD = 32
+
+
+def build_crc_table(poly=0x07):
+	table = []
+	for byte in range(256):
+		crc = byte
+		for _ in range(8):
+			crc = ((crc << 1) ^ poly) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+		table.append(crc)
+	return table
+
+
+CRC_TABLE = build_crc_table()
+
+
+def crc8(data):
+	crc = 0
+	for byte in data:
+		crc = CRC_TABLE[crc ^ byte]
+	return crc
+
+
+def encode_frame(msg_type, seq, payload=b""):
+	body = bytes((msg_type, seq & 0xFF, len(payload))) + bytes(payload)
+	return SYNC + body + bytes((crc8(body),))
+
+
+class FrameParser:
+	def __init__(self):
+		self.buffer = bytearray()
+		self.errors = 0
+
+	def feed(self, data):
+		self.buffer += data
+		frames = []
+
+		while True:
+			start = self.buffer.find(SYNC)
+			if start < 0:
+				# Keep a trailing first sync byte in case the second one is still in flight.
+				del self.buffer[:max(0, len(self.buffer) - 1)]
+				return frames
+			del self.buffer[:start]
+
+			if len(self.buffer) < HEADER_SIZE:
+				return frames
+			length = self.buffer[4]
+			if length > MAX_PAYLOAD:
+				self.errors += 1
+				del self.buffer[:1]
+				continue
+			if len(self.buffer) < HEADER_SIZE + length + 1:
+				return frames
+
+			body = bytes(self.buffer[2:HEADER_SIZE + length])
+			checksum = self.buffer[HEADER_SIZE + length]
+			if crc8(body) != checksum:
+				# Resynchronize on the next sync marker rather than discarding the whole buffer.
+				self.errors += 1
+				del self.buffer[:1]
+				continue
+
+			del self.buffer[:HEADER_SIZE + length + 1]
+			frames.append((body[0], body[1], body[3:]))
+
+
+class FakeServoDevice:
+	def __init__(self, count=5):
+		self.angles = [0] * count
+		self.parser = FrameParser()
+		self.frames = 0
+
+	def receive(self, data):
+		response = b""
+		for msg_type, seq, payload in self.parser.feed(data):
+			if msg_type & ~ACK_REQUESTED == MSG_ANGLES:
+				self.angles[:len(payload)] = list(payload)
+				self.frames += 1
+			if msg_type & ACK_REQUESTED:
+				response += encode_frame(MSG_ACK, seq)
+		return response
+
+
+class LoopbackDevice:
+	def __init__(self, device=None):
+		self.device = device or FakeServoDevice()
+		self.pending = bytearray()
+		self.written = 0
+
+	def write(self, data):
+		self.written += len(data)
+		self.pending += self.device.receive(data)
+		return len(data)
+
+	def read(self, size=1):
+		data = bytes(self.pending[:size])
+		del self.pending[:size]
+		return data
+
+	def close(self):
+		pass
+
+
+class PtyServoSimulator:
+	def __init__(self, device=None):
+		import pty
+
+		self.device = device or FakeServoDevice()
+		# The slave end stays open for the simulator's lifetime, so the port does not hang up between clients.
+		self.master, self.slave = pty.openpty()
+		self.port = os.ttyname(self.slave)
+		self.running = True
+		self.thread = threading.Thread(target=self.loop, daemon=True)
+		self.thread.start()
+
+	def loop(self):
+		while self.running:
+			# Polling with a timeout lets close() stop the thread before the descriptors go away.
+			ready, _, _ = select.select([self.master], [], [], 0.05)
+			if not ready:
+				continue
+			try:
+				data = os.read(self.master, 256)
+			except OSError:
+				return
+			response = self.device.receive(data)
+			if response:
+				os.write(self.master, response)
+
+	def close(self):
+		self.running = False
+		self.thread.join(timeout=1.0)
+		os.close(self.master)
+		os.close(self.slave)
+
+
+def open_device(port, baudrate=115200, timeout=0.05):
+	if port == "loopback":
+		return LoopbackDevice()
+
+	import serial
+
+	return serial.Serial(port, baudrate, timeout=timeout)
+
+
+class ServoLink:
+	def __init__(self, device, count=5, keepalive=0.5, min_interval=0.005, acks=False, ack_timeout=0.05, retries=2):
+		self.device = device
+		self.count = count
+		self.keepalive = keepalive
+		self.min_interval = min_interval
+		self.acks = acks
+		self.ack_timeout = ack_timeout
+		self.retries = retries
+
+		self.condition = threading.Condition()
+		self.target = None
+		self.target_time = None
+		self.version = 0
+		self.sent_version = 0
+		self.sent_angles = None
+		self.seq = 0
+		self.parser = FrameParser()
+		self.stats = Telemetry(enabled=True)
+		self.counts = collections.Counter()
+
+		self.running = True
+		self.thread = threading.Thread(target=self.loop, daemon=True)
+		self.thread.start()
+
+	def set(self, angles):
+		angles = bytes(max(0, min(180, int(angle))) for angle in angles[:self.count])
+		with self.condition:
+			# Only the newest angles are kept, so a burst of updates between sends collapses into one frame.
+			if angles == self.target:
+				return
+			if self.version != self.sent_version:
+				self.counts["coalesced"] += 1
+			self.target = angles
+			self.target_time = time.perf_counter()
+			self.version += 1
+			self.condition.notify()
+
+	def loop(self):
+		last_send = 0.0
+		while self.running:
+			with self.condition:
+				if self.target is None:
+					self.condition.wait()
+				elif self.version == self.sent_version:
+					self.condition.wait(timeout=max(0.0, last_send + self.keepalive - time.perf_counter()))
+				if not self.running:
+					return
+
+				changed = self.version != self.sent_version
+				angles, target_time, version = self.target, self.target_time, self.version
+
+			now = time.perf_counter()
+			if angles is None:
+				continue
+			if not changed and now - last_send < self.keepalive:
+				continue
+
+			# Sleeping here, outside the lock, is what coalesces bursts: later set() calls just replace the target.
+			delay = last_send + self.min_interval - now
+			if changed and delay > 0:
+				time.sleep(delay)
+				with self.condition:
+					angles, target_time, version = self.target, self.target_time, self.version
+
+			self.send(angles)
+			last_send = time.perf_counter()
+			with self.condition:
+				self.sent_version = version
+			if changed:
+				self.stats.record("latency", (last_send - target_time) * 1000)
+			else:
+				self.counts["keepalive"] += 1
+
+	def send(self, angles):
+		self.seq = (self.seq + 1) & 0xFF
+		msg_type = MSG_ANGLES | (ACK_REQUESTED if self.acks else 0)
+		frame = encode_frame(msg_type, self.seq, angles)
+
+		for attempt in range(1 + (self.retries if self.acks else 0)):
+			with self.stats.stage("write"):
+				self.device.write(frame)
+			self.counts["sent"] += 1
+			self.sent_angles = angles
+			if not self.acks or self.wait_for_ack(self.seq):
+				return True
+			self.counts["retries"] += 1
+
+		self.counts["ack_failures"] += 1
+		return False
+
+	def wait_for_ack(self, seq):
+		deadline = time.perf_counter() + self.ack_timeout
+		with self.stats.stage("ack"):
+			while time.perf_counter() < deadline:
+				data = self.device.read(HEADER_SIZE + 1)
+				for msg_type, ack_seq, _ in self.parser.feed(data):
+					if msg_type == MSG_ACK and ack_seq == seq:
+						return True
+				if not data:
+					time.sleep(0.001)
+		return False
+
+	def summary(self):
+		return {**self.counts, "parse_errors": self.parser.errors, **self.stats.summary()}
+
+	def close(self):
+		with self.condition:
+			self.running = False
+			self.condition.notify()
+		self.thread.join(timeout=1.0)
+		self.device.close()
@@ -0,0 +1,153 @@
+import random
+import sys
+import time
+import pytest
+from servo_link import (
+	ACK_REQUESTED, MSG_ACK, MSG_ANGLES, FakeServoDevice, FrameParser, LoopbackDevice, PtyServoSimulator, ServoLink, crc8,
+	encode_frame, open_device,
+)
+
+
+def ino_crc8(data):
+	# Bit-by-bit port of crc8() in hand_control.ino.
+	crc = 0
+	for byte in data:
+		crc ^= byte
+		for _ in range(8):
+			crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+	return crc
+
+
+def wait_until(condition, timeout=1.0):
+	deadline = time.perf_counter() + timeout
+	while time.perf_counter() < deadline:
+		if condition():
+			return True
+		time.sleep(0.002)
+	return condition()
+
+
+class SilentServoDevice(FakeServoDevice):
+	def receive(self, data):
+		super().receive(data)
+		return b""
+
+
+@pytest.fixture
+def device():
+	return LoopbackDevice()
+
+
+@pytest.fixture
+def link(request, device):
+	# Tests pick link options with @pytest.mark.parametrize("link", [{...}], indirect=True).
+	link = ServoLink(device, **getattr(request, "param", {}))
+	yield link
+	link.close()
+
+
+def test_crc8_matches_sketch_polynomial():
+	assert crc8(b"123456789") == 0xF4
+
+	rng = random.Random(0)
+	for _ in range(200):
+		data = bytes(rng.randrange(256) for _ in range(rng.randrange(1, 40)))
+		assert crc8(data) == ino_crc8(data)
+
+
+def test_parser_decodes_frames_split_across_reads():
+	frame = encode_frame(MSG_ANGLES, 7, bytes([10, 20, 30, 40, 50]))
+	parser = FrameParser()
+
+	assert parser.feed(frame[:4]) == []
+	assert parser.feed(frame[4:]) == [(MSG_ANGLES, 7, bytes([10, 20, 30, 40, 50]))]
+	assert parser.errors == 0
+
+
+def test_parser_resyncs_after_garbage():
+	frame = encode_frame(MSG_ANGLES, 1, bytes([90] * 5))
+	parser = FrameParser()
+
+	assert parser.feed(b"\x00\x13\xA5\xFF" + frame) == [(MSG_ANGLES, 1, bytes([90] * 5))]
+
+
+def test_parser_resyncs_after_bad_checksum():
+	good = encode_frame(MSG_ANGLES, 2, bytes([1, 2, 3, 4, 5]))
+	bad = bytearray(encode_frame(MSG_ANGLES, 1, bytes([9] * 5)))
+	bad[-1] ^= 0xFF
+	parser = FrameParser()
+
+	assert parser.feed(bytes(bad) + good) == [(MSG_ANGLES, 2, bytes([1, 2, 3, 4, 5]))]
+	assert parser.errors == 1
+
+
+def test_fake_device_acknowledges_on_request():
+	device = FakeServoDevice()
+	response = device.receive(encode_frame(MSG_ANGLES | ACK_REQUESTED, 42, bytes([0, 45, 90, 135, 180])))
+
+	assert device.angles == [0, 45, 90, 135, 180]
+	assert FrameParser().feed(response) == [(MSG_ACK, 42, b"")]
+
+
+@pytest.mark.parametrize("link", [{"min_interval": 0.05, "keepalive": 10.0}], indirect=True)
+def test_link_coalesces_bursts_and_skips_unchanged(link, device):
+	for angle in range(100):
+		link.set([angle, 0, 0, 0, 0])
+	assert wait_until(lambda: device.device.angles[0] == 99)
+	frames = device.device.frames
+	assert frames <= 3
+	assert link.summary()["coalesced"] > 0
+
+	link.set([99, 0, 0, 0, 0])
+	time.sleep(0.1)
+	assert device.device.frames == frames
+
+
+@pytest.mark.parametrize("link", [{"keepalive": 0.03}], indirect=True)
+def test_link_sends_keepalives_while_idle(link, device):
+	link.set([10, 20, 30, 40, 50])
+	assert wait_until(lambda: link.summary().get("keepalive", 0) >= 3)
+	assert device.device.angles == [10, 20, 30, 40, 50]
+
+
+@pytest.mark.parametrize("link", [{"acks": True, "keepalive": 10.0}], indirect=True)
+def test_link_waits_for_acks(link):
+	link.set([5, 6, 7, 8, 9])
+	assert wait_until(lambda: link.summary().get("sent", 0) == 1)
+	summary = link.summary()
+	assert "retries" not in summary and "ack_failures" not in summary
+
+
+@pytest.mark.parametrize("device", [LoopbackDevice(SilentServoDevice())])
+@pytest.mark.parametrize("link", [{"acks": True, "ack_timeout": 0.01, "retries": 2, "keepalive": 10.0}], indirect=True)
+def test_link_retries_when_acks_are_missing(link):
+	link.set([5, 6, 7, 8, 9])
+	assert wait_until(lambda: link.summary().get("ack_failures", 0) == 1)
+	assert link.summary()["sent"] == 3
+
+
+
+@pytest.fixture
+def simulator():
+	if sys.platform == "win32":
+		pytest.skip("pseudo-terminals need a POSIX system")
+	simulator = PtyServoSimulator()
+	yield simulator
+	simulator.close()
+
+
+@pytest.fixture
+def serial_link(simulator):
+	pytest.importorskip("serial")
+	link = ServoLink(open_device(simulator.port), acks=True, ack_timeout=0.2, keepalive=10.0)
+	yield link
+	link.close()
+
+
+def test_link_over_a_pseudo_terminal(serial_link, simulator):
+	# pyserial opens the simulator's pty like a real port, so termios setup, framing and ack reads all run for real.
+	serial_link.set([15, 30, 45, 60, 75])
+
+	assert wait_until(lambda: simulator.device.angles == [15, 30, 45, 60, 75])
+	assert wait_until(lambda: serial_link.summary().get("sent", 0) == 1)
+	assert "ack_failures" not in serial_link.summary()